@@ -0,0 +1,43 @@
+import os
+import tempfile
+import time
+
+from file_processor import FileProcessor, RealFileHandler
+
+
+def create_files(tmpdir, count, size):
+    """Create count text files of size bytes each."""
+    names = []
+    for i in range(count):
+        name = os.path.join(tmpdir, f"input_{i}.txt")
+        with open(name, "w") as f:
+            f.write("hello world\n" * (size // 12))
+        names.append(name)
+    return names
+
+
+def bench_process_many(tmpdir, count=200, size=256 * 1024):
+    """Show how process_many scales with the number of workers."""
+    print("== process_many ==")
+    names = create_files(tmpdir, count, size)
+    processor = FileProcessor(RealFileHandler())
+
+    start = time.perf_counter()
+    for name in names:
+        processor.process_text(name)
+    serial = time.perf_counter() - start
+    print(f"{'serial loop':<24} {count / serial:>10,.0f} files/s")
+
+    for executor in ("thread", "process"):
+        for workers in (1, 2, 4, 8):
+            start = time.perf_counter()
+            for _ in processor.process_many(names, workers=workers, executor=executor):
+                pass
+            elapsed = time.perf_counter() - start
+            label = f"{executor}, {workers} workers"
+            print(f"{label:<24} {count / elapsed:>10,.0f} files/s  x{serial / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bench_process_many(tmpdir)
@@ -1,4 +1,48 @@
+import asyncio
+import errno
+import mmap
 import os
+import shutil
+import sys
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+
+CHUNK_SIZE = 64 * 1024
+
+# errors meaning "this fast path is not available here", not "copy failed"
+_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+
+class FileChangedError(OSError):
+    """File was modified while it was memory-mapped."""
+
+
+def _copy_fileobj(src, dst):
+    """Copy open binary file src to dst, inside the kernel when possible."""
+    in_fd, out_fd = src.fileno(), dst.fileno()
+    size = os.fstat(in_fd).st_size
+    copied = 0
+    for fast_copy in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+        if fast_copy is None:
+            continue
+        try:
+            while True:
+                if fast_copy is os.sendfile:
+                    sent = os.sendfile(out_fd, in_fd, copied, max(size - copied, CHUNK_SIZE))
+                else:
+                    sent = fast_copy(in_fd, out_fd, max(size - copied, CHUNK_SIZE), copied, copied)
+                if sent == 0:
+                    return
+                copied += sent
+        except OSError as exc:
+            if copied or exc.errno not in _FALLBACK_ERRNOS:
+                raise
+    shutil.copyfileobj(src, dst, CHUNK_SIZE)
 
 
 class RealFileHandler:
@@ -9,6 +53,45 @@ class RealFileHandler:
         with open(filename, 'r') as f:
             return f.read()
     
+    def read_chunks(self, filename, chunk_size=CHUNK_SIZE):
+        """Yield file content in pieces of at most chunk_size characters."""
+        with open(filename, 'r') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+    
+    @contextmanager
+    def read_buffer(self, filename):
+        """Map file into memory and yield a read-only memoryview of its bytes.
+        
+        Nothing is copied until the caller slices out bytes. The view is only
+        valid inside the with-block. Growth after mapping is not visible; if
+        size or mtime changed by the end of the block, FileChangedError is
+        raised because the data seen may be inconsistent. (Truncating a
+        mapped file can still kill the process with SIGBUS on POSIX.)
+        """
+        with open(filename, 'rb') as f:
+            before = os.fstat(f.fileno())
+            if before.st_size == 0:
+                # mmap cannot map an empty file
+                yield memoryview(b"")
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+                try:
+                    mapped.close()
+                except BufferError:
+                    pass  # caller kept a slice; closed when it is collected
+            after = os.fstat(f.fileno())
+            if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+                raise FileChangedError(f"{filename} changed while mapped")
+    
     def write(self, filename, data):
         """Write data to file. Returns True on success."""
         try:
@@ -18,6 +101,26 @@ class RealFileHandler:
         except:
             return False
     
+    def copy(self, source, destination):
+        """Copy file bytes without decoding. Returns True on success.
+        
+        Uses os.copy_file_range or os.sendfile so data stays in the kernel,
+        falling back to shutil.copyfileobj. A missing source raises
+        FileNotFoundError, the same as read(). Copying a file onto itself
+        returns False and leaves it untouched.
+        """
+        with open(source, 'rb') as src:
+            try:
+                if os.path.exists(destination) and os.path.samestat(
+                    os.fstat(src.fileno()), os.stat(destination)
+                ):
+                    return False
+                with open(destination, 'wb') as dst:
+                    _copy_fileobj(src, dst)
+                return True
+            except OSError:
+                return False
+    
     def exists(self, filename):
         """Check if file exists."""
         return os.path.exists(filename)
@@ -27,6 +130,163 @@ class RealFileHandler:
         return os.path.getsize(filename)
 
 
+class CachingFileHandler:
+    """Wrap a handler and cache file content and results derived from it.
+    
+    Entries are keyed by (path, st_mtime_ns, st_size), so each read costs a
+    single os.stat() and a changed file is read again. Content plus derived
+    results are kept within max_bytes, evicting least recently used files.
+    Writes and copies through this handler drop the destination entry; a
+    file rewritten elsewhere with the same size and mtime is not noticed.
+    """
+    
+    def __init__(self, file_handler=None, max_bytes=32 * 1024 * 1024):
+        """Initialize with wrapped handler (RealFileHandler by default)."""
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+        self.file_handler = RealFileHandler() if file_handler is None else file_handler
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def _lookup(self, filename):
+        """Return (path, stamp, entry); entry is None unless still valid."""
+        path = os.path.abspath(filename)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry["stamp"] == stamp:
+                self._entries.move_to_end(path)
+                return path, stamp, entry
+        return path, stamp, None
+    
+    def _store(self, path, stamp, key, value):
+        """Add value under key to path's entry, then evict down to max_bytes."""
+        size = sys.getsizeof(value)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry["stamp"] != stamp:
+                self._drop(path)
+                entry = self._entries[path] = {"stamp": stamp, "values": {}, "bytes": 0}
+            if key in entry["values"]:
+                return
+            entry["values"][key] = value
+            entry["bytes"] += size
+            self.bytes += size
+            self._entries.move_to_end(path)
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def _drop(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.bytes -= entry["bytes"]
+    
+    def read(self, filename):
+        """Read file content, from cache if the file is unchanged."""
+        return self.derive(filename, None)
+    
+    def derive(self, filename, func):
+        """Return func(content), cached per func until the file changes.
+        
+        func=None gives the content itself. func should be a module-level
+        function or builtin such as str.upper, since it is the cache key.
+        """
+        path, stamp, entry = self._lookup(filename)
+        values = {} if entry is None else entry["values"]
+        if func in values:
+            with self._lock:
+                self.hits += 1
+            return values[func]
+        if None in values:
+            content = values[None]
+            with self._lock:
+                self.hits += 1
+        else:
+            content = self.file_handler.read(filename)
+            with self._lock:
+                self.misses += 1
+            self._store(path, stamp, None, content)
+        if func is None:
+            return content
+        result = func(content)
+        self._store(path, stamp, func, result)
+        return result
+    
+    def write(self, filename, data):
+        """Write data to file. Returns True on success."""
+        self.invalidate(filename)
+        return self.file_handler.write(filename, data)
+    
+    def copy(self, source, destination):
+        """Copy file with the wrapped handler, or via cached read()."""
+        self.invalidate(destination)
+        if _supports(self.file_handler, "copy"):
+            return self.file_handler.copy(source, destination)
+        return self.file_handler.write(destination, self.read(source))
+    
+    def exists(self, filename):
+        """Check if file exists."""
+        return self.file_handler.exists(filename)
+    
+    def get_size(self, filename):
+        """Get file size in bytes."""
+        return self.file_handler.get_size(filename)
+    
+    def invalidate(self, filename):
+        """Drop cached values of a single file."""
+        with self._lock:
+            self._drop(os.path.abspath(filename))
+    
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+    
+    def stats(self):
+        """Return counters snapshot."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "files": len(self._entries),
+                "bytes": self.bytes,
+            }
+
+
+PARALLEL_OPERATIONS = ("process_text", "copy_file", "get_file_info")
+
+
+def _run_operation(processor, op, args):
+    """Run one process_many() item. Missing files give None, as in safe_read().
+    
+    Other errors are returned rather than raised, so one bad file does not
+    end the batch.
+    """
+    try:
+        return getattr(processor, op)(*args)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        return exc
+
+
+def _supports(handler, capability):
+    """Check whether handler's class implements an optional capability."""
+    # __class__ rather than type() so Mock(spec=SomeHandler) is detected too
+    return callable(getattr(handler.__class__, capability, None))
+
+
 class FileProcessor:
     """Process files using dependency injection for external file operations."""
     
@@ -35,26 +295,103 @@ class FileProcessor:
         self.file_handler = file_handler
     
     def process_text(self, filename):
-        """Read text file and convert to uppercase."""
+        """Read text file and convert to uppercase.
+        
+        Handlers with derive(), like CachingFileHandler, keep the result.
+        """
+        if _supports(self.file_handler, "derive"):
+            return self.file_handler.derive(filename, str.upper)
         content = self.file_handler.read(filename)
         return content.upper()
     
+    def iter_process_text(self, filename, chunk_size=CHUNK_SIZE):
+        """Yield uppercased chunks of file; joined they equal process_text().
+        
+        str.upper() maps every character on its own, so converting chunk by
+        chunk gives the same result with memory bounded by chunk_size.
+        Handlers without read_chunks() fall back to a single read().
+        """
+        if not _supports(self.file_handler, "read_chunks"):
+            yield self.process_text(filename)
+            return
+        for chunk in self.file_handler.read_chunks(filename, chunk_size):
+            yield chunk.upper()
+    
+    def process_text_to(self, filename, destination, chunk_size=CHUNK_SIZE):
+        """Write uppercased file to writable destination. Returns chars written."""
+        written = 0
+        for chunk in self.iter_process_text(filename, chunk_size):
+            destination.write(chunk)
+            written += len(chunk)
+        return written
+    
     def save_data(self, filename, data):
         """Save data to file and return success status."""
         return self.file_handler.write(filename, data)
     
     def copy_file(self, source, destination):
-        """Copy file from source to destination."""
+        """Copy file from source to destination.
+        
+        Handlers whose class defines copy() do it themselves, otherwise the
+        content goes through read() and write().
+        """
+        if _supports(self.file_handler, "copy"):
+            return self.file_handler.copy(source, destination)
         content = self.file_handler.read(source)
         return self.file_handler.write(destination, content)
     
-    def safe_read(self, filename):
-        """Safely read file. Returns None if file doesn't exist."""
+    def process_bytes(self, filename, func):
+        """Return func(buffer) where buffer is a read-only view of file bytes.
+        
+        Handlers with read_buffer() give a memory-mapped view, so func can
+        hash, search or parse the file without copying it. Others fall back
+        to read() encoded as UTF-8.
+        """
+        if _supports(self.file_handler, "read_buffer"):
+            with self.file_handler.read_buffer(filename) as buffer:
+                return func(buffer)
+        return func(memoryview(self.file_handler.read(filename).encode("utf-8")))
+    
+    def safe_read(self, filename, func=None):
+        """Safely read file. Returns None if file doesn't exist.
+        
+        With func, returns process_bytes(filename, func) instead of the text.
+        """
         try:
+            if func is not None:
+                return self.process_bytes(filename, func)
             return self.file_handler.read(filename)
         except FileNotFoundError:
             return None
     
+    def process_many(self, items, op="process_text", workers=None, executor="thread",
+                     ordered=True):
+        """Run op on many files concurrently. Yields (item, result) pairs.
+        
+        items are filenames, or (source, destination) tuples for copy_file.
+        A missing file gives None as its result, the same as safe_read();
+        any other error is given as the exception instance for that item and
+        the rest of the batch goes on. With ordered=False pairs come as soon
+        as they finish. executor="process" needs a picklable file handler.
+        Closing the generator early cancels work that has not started.
+        """
+        if op not in PARALLEL_OPERATIONS:
+            raise ValueError(f"op must be one of {PARALLEL_OPERATIONS}")
+        pools = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+        if executor not in pools:
+            raise ValueError('executor must be "thread" or "process"')
+        pool = pools[executor](max_workers=workers)
+        try:
+            futures = {}
+            for item in items:
+                args = item if isinstance(item, tuple) else (item,)
+                futures[pool.submit(_run_operation, self, op, args)] = item
+            done = futures if ordered else as_completed(futures)
+            for future in done:
+                yield futures[future], future.result()
+        finally:
+            pool.shutdown(cancel_futures=True)
+    
     def get_file_info(self, filename):
         """Get file info. Returns dict with exists and size."""
         exists = self.file_handler.exists(filename)
@@ -66,6 +403,129 @@ class FileProcessor:
         return {"exists": exists, "size": size}
 
 
+class AsyncFileHandler(ABC):
+    """Interface of asynchronous file handlers used by AsyncFileProcessor."""
+    
+    @abstractmethod
+    async def read(self, filename):
+        """Read file content."""
+    
+    @abstractmethod
+    async def write(self, filename, data):
+        """Write data to file. Returns True on success."""
+    
+    @abstractmethod
+    async def exists(self, filename):
+        """Check if file exists."""
+    
+    @abstractmethod
+    async def get_size(self, filename):
+        """Get file size in bytes."""
+
+
+class ThreadedAsyncFileHandler(AsyncFileHandler):
+    """Run a synchronous handler on a bounded thread pool.
+    
+    At most max_workers calls run at once, and at most max_pending calls
+    per event loop are queued or running, which also caps the file
+    descriptors in use. The handler can be reused across asyncio.run().
+    """
+    
+    def __init__(self, file_handler=None, max_workers=4, max_pending=64):
+        """Initialize with sync handler (RealFileHandler by default)."""
+        if max_pending < max_workers:
+            raise ValueError("max_pending must be >= max_workers")
+        self.file_handler = RealFileHandler() if file_handler is None else file_handler
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="AsyncFileHandler")
+        self._limits = weakref.WeakKeyDictionary()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Shut down the thread pool after running calls finish."""
+        self._executor.shutdown()
+    
+    async def _run(self, method, *args):
+        loop = asyncio.get_running_loop()
+        # asyncio.Semaphore binds to one loop, so keep one per loop
+        limit = self._limits.get(loop)
+        if limit is None:
+            limit = self._limits[loop] = asyncio.Semaphore(self.max_pending)
+        async with limit:
+            return await loop.run_in_executor(
+                self._executor, getattr(self.file_handler, method), *args
+            )
+    
+    async def read(self, filename):
+        """Read file content."""
+        return await self._run("read", filename)
+    
+    async def write(self, filename, data):
+        """Write data to file. Returns True on success."""
+        return await self._run("write", filename, data)
+    
+    async def exists(self, filename):
+        """Check if file exists."""
+        return await self._run("exists", filename)
+    
+    async def get_size(self, filename):
+        """Get file size in bytes."""
+        return await self._run("get_size", filename)
+    
+    async def copy(self, source, destination):
+        """Copy file with the wrapped handler. Returns True on success."""
+        if not _supports(self.file_handler, "copy"):
+            content = await self.read(source)
+            return await self.write(destination, content)
+        return await self._run("copy", source, destination)
+
+
+class AsyncFileProcessor:
+    """Asynchronous counterpart of FileProcessor using an AsyncFileHandler."""
+    
+    def __init__(self, file_handler):
+        """Initialize processor with async file handler."""
+        self.file_handler = file_handler
+    
+    async def process_text(self, filename):
+        """Read text file and convert to uppercase."""
+        content = await self.file_handler.read(filename)
+        return content.upper()
+    
+    async def save_data(self, filename, data):
+        """Save data to file and return success status."""
+        return await self.file_handler.write(filename, data)
+    
+    async def copy_file(self, source, destination):
+        """Copy file from source to destination."""
+        if _supports(self.file_handler, "copy"):
+            return await self.file_handler.copy(source, destination)
+        content = await self.file_handler.read(source)
+        return await self.file_handler.write(destination, content)
+    
+    async def safe_read(self, filename):
+        """Safely read file. Returns None if file doesn't exist."""
+        try:
+            return await self.file_handler.read(filename)
+        except FileNotFoundError:
+            return None
+    
+    async def get_file_info(self, filename):
+        """Get file info. Returns dict with exists and size."""
+        exists = await self.file_handler.exists(filename)
+        if exists:
+            size = await self.file_handler.get_size(filename)
+        else:
+            size = 0
+        
+        return {"exists": exists, "size": size}
+
+
 if __name__ == "__main__":
     handler = RealFileHandler()
     processor = FileProcessor(handler)
@@ -78,6 +538,15 @@ if __name__ == "__main__":
     result = processor.process_text("test_input.txt")
     print(f"Processed: {result}")
     
+    # Stream large file in chunks
+    with open("output_upper.txt", "w") as out:
+        written = processor.process_text_to("test_input.txt", out, chunk_size=4)
+    print(f"Streamed characters: {written}")
+    
+    # Work on mapped bytes without copying the whole file
+    header = processor.process_bytes("test_input.txt", lambda buffer: bytes(buffer[:5]))
+    print(f"First bytes: {header}")
+    
     # Save data to file
     success = processor.save_data("output.txt", "Hello World")
     print(f"Save successful: {success}")
@@ -90,6 +559,27 @@ if __name__ == "__main__":
     content = processor.safe_read("nonexistent.txt")
     print(f"Safe read result: {content}")
     
+    # Repeated reads of an unchanged file come from the cache
+    cached = FileProcessor(CachingFileHandler())
+    for _ in range(3):
+        cached.process_text("test_input.txt")
+    print(f"Cache stats: {cached.file_handler.stats()}")
+    
+    # Several files at once
+    for name, info in processor.process_many(["test_input.txt", "missing.txt"], op="get_file_info"):
+        print(f"Parallel info for {name}: {info}")
+    
+    # Async processing on a bounded thread pool
+    async def async_demo():
+        async with ThreadedAsyncFileHandler(max_workers=2) as async_handler:
+            async_processor = AsyncFileProcessor(async_handler)
+            texts = await asyncio.gather(
+                *(async_processor.process_text("test_input.txt") for _ in range(3))
+            )
+            print(f"Async processed: {texts}")
+    
+    asyncio.run(async_demo())
+    
     # Get file info
     info = processor.get_file_info("test_input.txt")
     print(f"File info: {info}")
@@ -97,4 +587,5 @@ if __name__ == "__main__":
     # # Cleanup
     # os.remove("test_input.txt")
     # os.remove("output.txt")
-    # os.remove("copy.txt")
\ No newline at end of file
+    # os.remove("copy.txt")
+    # os.remove("output_upper.txt")
\ No newline at end of file
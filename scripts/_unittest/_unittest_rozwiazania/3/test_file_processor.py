@@ -1,6 +1,20 @@
+import asyncio
+import errno
+import io
+import os
+import tempfile
+import threading
 import unittest
-from unittest.mock import Mock
-from file_processor import FileProcessor
+from unittest.mock import AsyncMock, Mock, patch
+from file_processor import (
+    AsyncFileHandler,
+    AsyncFileProcessor,
+    CachingFileHandler,
+    FileChangedError,
+    FileProcessor,
+    RealFileHandler,
+    ThreadedAsyncFileHandler,
+)
 
 
 class TestFileProcessor(unittest.TestCase):
@@ -26,6 +40,36 @@ class TestFileProcessor(unittest.TestCase):
         
         self.mock_handler.read.assert_called_with("test.txt")
 
+    def test_iter_process_text_uppercases_each_chunk(self):
+        """Test that iter_process_text converts chunks from read_chunks()."""
+        handler = Mock(spec=RealFileHandler)
+        handler.read_chunks.return_value = iter(["hello ", "world"])
+        
+        result = list(FileProcessor(handler).iter_process_text("test.txt", chunk_size=6))
+        
+        self.assertEqual(result, ["HELLO ", "WORLD"])
+        handler.read_chunks.assert_called_with("test.txt", 6)
+
+    def test_iter_process_text_falls_back_to_read(self):
+        """Test that handlers without read_chunks() still work."""
+        self.mock_handler.read.return_value = "hello"
+        
+        result = list(self.processor.iter_process_text("test.txt"))
+        
+        self.assertEqual(result, ["HELLO"])
+        self.mock_handler.read_chunks.assert_not_called()
+
+    def test_process_text_to_writes_destination(self):
+        """Test that process_text_to writes chunks and returns their length."""
+        handler = Mock(spec=RealFileHandler)
+        handler.read_chunks.return_value = iter(["ab", "c"])
+        destination = io.StringIO()
+        
+        written = FileProcessor(handler).process_text_to("test.txt", destination)
+        
+        self.assertEqual(destination.getvalue(), "ABC")
+        self.assertEqual(written, 3)
+
     def test_save_data_returns_handler_result(self):
         """Test that save_data returns what handler.write() returns."""
         self.mock_handler.write.return_value = True
@@ -51,6 +95,17 @@ class TestFileProcessor(unittest.TestCase):
         self.mock_handler.write.assert_called_with("dest.txt", "content")
         self.assertTrue(result)
 
+    def test_copy_file_uses_handler_copy_when_supported(self):
+        """Test that copy_file delegates to a handler implementing copy()."""
+        handler = Mock(spec=RealFileHandler)
+        handler.copy.return_value = True
+        
+        result = FileProcessor(handler).copy_file("source.txt", "dest.txt")
+        
+        self.assertTrue(result)
+        handler.copy.assert_called_with("source.txt", "dest.txt")
+        handler.read.assert_not_called()
+
     def test_safe_read_returns_content_when_file_exists(self):
         """Test safe_read returns content when no exception."""
         self.mock_handler.read.return_value = "file content"
@@ -59,6 +114,14 @@ class TestFileProcessor(unittest.TestCase):
         
         self.assertEqual(result, "file content")
 
+    def test_process_bytes_falls_back_to_encoded_read(self):
+        """Test that handlers without read_buffer() still give bytes."""
+        self.mock_handler.read.return_value = "zażółć"
+        
+        result = self.processor.process_bytes("test.txt", bytes)
+        
+        self.assertEqual(result, "zażółć".encode("utf-8"))
+
     def test_safe_read_returns_none_on_file_not_found(self):
         """Test safe_read returns None when FileNotFoundError raised."""
         self.mock_handler.read.side_effect = FileNotFoundError("File not found")
@@ -67,6 +130,67 @@ class TestFileProcessor(unittest.TestCase):
         
         self.assertIsNone(result)
 
+    def test_process_many_keeps_input_order(self):
+        """Test that ordered results follow the input order."""
+        self.mock_handler.read.side_effect = lambda filename: filename
+        
+        result = list(self.processor.process_many(["a.txt", "b.txt", "c.txt"], workers=3))
+        
+        self.assertEqual(result, [("a.txt", "A.TXT"), ("b.txt", "B.TXT"), ("c.txt", "C.TXT")])
+
+    def test_process_many_reports_missing_file_as_none(self):
+        """Test that a missing file gives None like safe_read()."""
+        def read(filename):
+            if filename == "missing.txt":
+                raise FileNotFoundError(filename)
+            return "ok"
+        self.mock_handler.read.side_effect = read
+        
+        result = dict(self.processor.process_many(["a.txt", "missing.txt"]))
+        
+        self.assertEqual(result, {"a.txt": "OK", "missing.txt": None})
+
+    def test_process_many_reports_other_errors_per_file(self):
+        """Test that a failing file gives its exception and the others still finish."""
+        error = PermissionError("denied.txt")
+        def read(filename):
+            if filename == "denied.txt":
+                raise error
+            return "ok"
+        self.mock_handler.read.side_effect = read
+        
+        result = dict(self.processor.process_many(["a.txt", "denied.txt", "b.txt"]))
+        
+        self.assertEqual(result, {"a.txt": "OK", "denied.txt": error, "b.txt": "OK"})
+
+    def test_process_many_closed_early_cancels_pending_work(self):
+        """Test that closing the generator does not wait for queued files."""
+        def read(filename):
+            threading.Event().wait(0.01)
+            return filename
+        self.mock_handler.read.side_effect = read
+        
+        results = self.processor.process_many([f"{i}.txt" for i in range(100)], workers=1)
+        next(results)
+        results.close()
+        
+        self.assertLess(self.mock_handler.read.call_count, 100)
+
+    def test_process_many_copy_file_takes_pairs(self):
+        """Test that copy_file items are (source, destination) tuples."""
+        self.mock_handler.read.return_value = "content"
+        self.mock_handler.write.return_value = True
+        
+        result = list(self.processor.process_many([("s.txt", "d.txt")], op="copy_file"))
+        
+        self.assertEqual(result, [(("s.txt", "d.txt"), True)])
+        self.mock_handler.write.assert_called_with("d.txt", "content")
+
+    def test_process_many_rejects_unknown_op(self):
+        """Test that only the supported operations are accepted."""
+        with self.assertRaises(ValueError):
+            list(self.processor.process_many(["a.txt"], op="save_data"))
+
     def test_get_file_info_when_file_exists(self):
         """Test get_file_info when file exists."""
         self.mock_handler.exists.return_value = True
@@ -87,5 +211,319 @@ class TestFileProcessor(unittest.TestCase):
         self.assertEqual(result, expected)
 
 
+class TestRealFileHandler(unittest.TestCase):
+
+    def setUp(self):
+        """Create temporary directory with a text file."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "input.txt")
+        with open(self.filename, "w") as f:
+            f.write("straße\r\nłódź\rend" * 50)
+        self.processor = FileProcessor(RealFileHandler())
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_copy_preserves_bytes(self):
+        """Test that copy() produces an identical file."""
+        destination = os.path.join(self.tmpdir.name, "copy.txt")
+        
+        self.assertTrue(self.processor.copy_file(self.filename, destination))
+        
+        with open(self.filename, "rb") as original, open(destination, "rb") as copy:
+            self.assertEqual(original.read(), copy.read())
+
+    def test_copy_falls_back_when_kernel_copy_unavailable(self):
+        """Test fallback to copyfileobj when fast paths are unsupported."""
+        destination = os.path.join(self.tmpdir.name, "copy.txt")
+        unsupported = OSError(errno.ENOSYS, "not supported")
+        
+        with patch("file_processor.os.copy_file_range", side_effect=unsupported, create=True), \
+                patch("file_processor.os.sendfile", side_effect=unsupported, create=True):
+            self.assertTrue(RealFileHandler().copy(self.filename, destination))
+        
+        self.assertEqual(os.path.getsize(destination), os.path.getsize(self.filename))
+
+    def test_copy_of_missing_source_raises_error(self):
+        """Test that a missing source raises FileNotFoundError like read()."""
+        with self.assertRaises(FileNotFoundError):
+            RealFileHandler().copy("missing.txt", os.path.join(self.tmpdir.name, "x"))
+
+    def test_copy_onto_itself_keeps_content(self):
+        """Test that copying a file onto itself fails without truncating it."""
+        size = os.path.getsize(self.filename)
+        
+        self.assertFalse(self.processor.copy_file(self.filename, self.filename))
+        
+        self.assertEqual(os.path.getsize(self.filename), size)
+
+    def test_read_buffer_is_read_only_view_of_bytes(self):
+        """Test that read_buffer yields the raw file bytes, read-only."""
+        with open(self.filename, "rb") as f:
+            expected = f.read()
+        
+        with RealFileHandler().read_buffer(self.filename) as buffer:
+            self.assertEqual(bytes(buffer), expected)
+            self.assertTrue(buffer.readonly)
+
+    def test_read_buffer_handles_empty_file(self):
+        """Test that an empty file gives an empty buffer."""
+        empty = os.path.join(self.tmpdir.name, "empty.txt")
+        open(empty, "w").close()
+        
+        self.assertEqual(self.processor.process_bytes(empty, len), 0)
+
+    def test_read_buffer_detects_file_changed_while_mapped(self):
+        """Test that growing the file during mapping raises FileChangedError."""
+        with self.assertRaises(FileChangedError):
+            with RealFileHandler().read_buffer(self.filename):
+                with open(self.filename, "a") as f:
+                    f.write("more")
+
+    def test_safe_read_with_func_uses_buffer(self):
+        """Test that safe_read applies func to mapped bytes, None if missing."""
+        size = self.processor.safe_read(self.filename, func=len)
+        
+        self.assertEqual(size, os.path.getsize(self.filename))
+        self.assertIsNone(self.processor.safe_read("missing.txt", func=len))
+
+    def test_process_many_in_process_pool(self):
+        """Test that the process executor gives the same results."""
+        names = [self.filename, os.path.join(self.tmpdir.name, "missing.txt")]
+        
+        result = dict(self.processor.process_many(
+            names, executor="process", workers=2, ordered=False
+        ))
+        
+        self.assertEqual(result[self.filename], self.processor.process_text(self.filename))
+        self.assertIsNone(result[names[1]])
+
+    def test_read_chunks_respects_chunk_size(self):
+        """Test that no chunk is longer than chunk_size."""
+        chunks = list(RealFileHandler().read_chunks(self.filename, 7))
+        
+        self.assertTrue(all(len(chunk) <= 7 for chunk in chunks))
+
+    def test_streamed_output_matches_process_text(self):
+        """Test that streaming gives exactly the process_text() result."""
+        expected = self.processor.process_text(self.filename)
+        
+        for chunk_size in (1, 3, 7, 1024):
+            with self.subTest(chunk_size=chunk_size):
+                streamed = "".join(self.processor.iter_process_text(self.filename, chunk_size))
+                self.assertEqual(streamed, expected)
+
+
+class TestAsyncFileProcessor(unittest.IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        self.mock_handler = AsyncMock(spec=AsyncFileHandler)
+        self.processor = AsyncFileProcessor(self.mock_handler)
+
+    async def test_process_text(self):
+        """Test text processing to uppercase."""
+        self.mock_handler.read.return_value = "hello world"
+        
+        result = await self.processor.process_text("input.txt")
+        
+        self.assertEqual(result, "HELLO WORLD")
+        self.mock_handler.read.assert_awaited_once_with("input.txt")
+
+    async def test_save_data(self):
+        """Test saving data."""
+        self.mock_handler.write.return_value = True
+        
+        result = await self.processor.save_data("output.txt", "data")
+        
+        self.assertTrue(result)
+        self.mock_handler.write.assert_awaited_once_with("output.txt", "data")
+
+    async def test_copy_file_falls_back_to_read_write(self):
+        """Test copy through read and write when handler has no copy."""
+        self.mock_handler.read.return_value = "content"
+        self.mock_handler.write.return_value = True
+        
+        result = await self.processor.copy_file("src.txt", "dst.txt")
+        
+        self.assertTrue(result)
+        self.mock_handler.write.assert_awaited_once_with("dst.txt", "content")
+
+    async def test_safe_read_missing_file(self):
+        """Test safe read returns None for missing file."""
+        self.mock_handler.read.side_effect = FileNotFoundError()
+        
+        self.assertIsNone(await self.processor.safe_read("missing.txt"))
+
+    async def test_get_file_info(self):
+        """Test file info for existing and missing file."""
+        self.mock_handler.exists.return_value = True
+        self.mock_handler.get_size.return_value = 1024
+        
+        self.assertEqual(await self.processor.get_file_info("file.txt"), {"exists": True, "size": 1024})
+        
+        self.mock_handler.exists.return_value = False
+        self.mock_handler.get_size.reset_mock()
+        
+        self.assertEqual(await self.processor.get_file_info("none.txt"), {"exists": False, "size": 0})
+        self.mock_handler.get_size.assert_not_awaited()
+
+
+class TestThreadedAsyncFileHandler(unittest.IsolatedAsyncioTestCase):
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filename = os.path.join(self.tmpdir.name, "input.txt")
+        with open(self.filename, "w", encoding="utf-8") as f:
+            f.write("hello async")
+
+    async def test_matches_sync_processor(self):
+        """Test that results match FileProcessor on a real file."""
+        copy = os.path.join(self.tmpdir.name, "copy.txt")
+        
+        async with ThreadedAsyncFileHandler() as handler:
+            processor = AsyncFileProcessor(handler)
+            text = await processor.process_text(self.filename)
+            copied = await processor.copy_file(self.filename, copy)
+            info = await processor.get_file_info(copy)
+        
+        self.assertEqual(text, FileProcessor(RealFileHandler()).process_text(self.filename))
+        self.assertTrue(copied)
+        self.assertEqual(info, FileProcessor(RealFileHandler()).get_file_info(self.filename))
+
+    async def test_limits_pending_calls(self):
+        """Test that no more than max_pending calls are handed to the pool at once."""
+        def read(filename):
+            threading.Event().wait(0.005)
+            return filename
+        
+        sync_handler = Mock(spec=RealFileHandler)
+        sync_handler.read.side_effect = read
+        loop = asyncio.get_running_loop()
+        run_in_executor = loop.run_in_executor
+        submitted = []
+        peak = []
+        
+        def counting_run_in_executor(*args):
+            future = run_in_executor(*args)
+            submitted.append(future)
+            peak.append(len(submitted))
+            future.add_done_callback(submitted.remove)
+            return future
+        
+        handler = ThreadedAsyncFileHandler(sync_handler, max_workers=1, max_pending=3)
+        with patch.object(loop, "run_in_executor", side_effect=counting_run_in_executor):
+            async with handler:
+                names = [f"file{i}.txt" for i in range(10)]
+                result = await asyncio.gather(*(handler.read(name) for name in names))
+        
+        self.assertEqual(result, names)
+        self.assertEqual(max(peak), 3)
+
+    def test_reusable_across_event_loops(self):
+        """Test that one handler works in consecutive asyncio.run() calls."""
+        handler = ThreadedAsyncFileHandler(max_workers=1, max_pending=1)
+        self.addCleanup(handler.close)
+        
+        async def read_twice():
+            return await asyncio.gather(handler.read(self.filename), handler.read(self.filename))
+        
+        for _ in range(2):
+            self.assertEqual(asyncio.run(read_twice()), ["hello async"] * 2)
+
+    def test_incomplete_handler_cannot_be_created(self):
+        """Test that a handler missing interface methods fails on creation."""
+        class ReadOnlyHandler(AsyncFileHandler):
+            async def read(self, filename):
+                return ""
+        
+        with self.assertRaises(TypeError):
+            ReadOnlyHandler()
+
+    def test_rejects_pending_below_workers(self):
+        """Test that max_pending smaller than max_workers is refused."""
+        with self.assertRaises(ValueError):
+            ThreadedAsyncFileHandler(max_workers=4, max_pending=2)
+
+
+class TestCachingFileHandler(unittest.TestCase):
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.filename = os.path.join(self.tmpdir.name, "config.txt")
+        with open(self.filename, "w", encoding="utf-8") as f:
+            f.write("key = value")
+        self.inner = Mock(spec=RealFileHandler, wraps=RealFileHandler())
+        self.handler = CachingFileHandler(self.inner)
+        self.processor = FileProcessor(self.handler)
+
+    def test_repeated_reads_hit_cache(self):
+        """Test that unchanged file is read once and derived results are kept."""
+        for _ in range(3):
+            self.assertEqual(self.processor.safe_read(self.filename), "key = value")
+            self.assertEqual(self.processor.process_text(self.filename), "KEY = VALUE")
+        
+        self.inner.read.assert_called_once_with(self.filename)
+        stats = self.handler.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (5, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 5 / 6)
+
+    def test_changed_file_is_read_again(self):
+        """Test that a new mtime or size invalidates the entry."""
+        self.processor.process_text(self.filename)
+        with open(self.filename, "w", encoding="utf-8") as f:
+            f.write("key = other value")
+        
+        self.assertEqual(self.processor.process_text(self.filename), "KEY = OTHER VALUE")
+        
+        os.utime(self.filename, ns=(0, 0))
+        self.processor.process_text(self.filename)
+        self.assertEqual(self.inner.read.call_count, 3)
+
+    def test_revalidates_with_single_stat(self):
+        """Test that a cached read costs one os.stat() call."""
+        self.handler.read(self.filename)
+        
+        with patch("file_processor.os.stat", wraps=os.stat) as stat:
+            self.processor.process_text(self.filename)
+        
+        stat.assert_called_once()
+
+    def test_write_through_handler_invalidates(self):
+        """Test that writing via the handler drops the old content."""
+        self.handler.read(self.filename)
+        self.processor.save_data(self.filename, "new")
+        
+        self.assertEqual(self.handler.read(self.filename), "new")
+
+    def test_evicts_least_recently_used_within_budget(self):
+        """Test that bytes stay under max_bytes and the oldest file goes first."""
+        names = []
+        for i in range(3):
+            name = os.path.join(self.tmpdir.name, f"file{i}.txt")
+            with open(name, "w", encoding="utf-8") as f:
+                f.write("x" * 1000)
+            names.append(name)
+        handler = CachingFileHandler(max_bytes=2500)
+        
+        for name in names:
+            handler.read(name)
+        handler.read(names[2])
+        
+        stats = handler.stats()
+        self.assertLessEqual(stats["bytes"], 2500)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["hits"], 1)
+        handler.read(names[0])
+        self.assertEqual(handler.stats()["misses"], 4)
+
+    def test_missing_file(self):
+        """Test that safe_read still returns None through the cache."""
+        missing = os.path.join(self.tmpdir.name, "missing.txt")
+        
+        self.assertIsNone(self.processor.safe_read(missing))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,140 @@
+import itertools
+import os
+import tempfile
+import time
+import tracemalloc
+
+from user_manager import PROFILES, ROW_FORMATS, UserManager
+
+
+def create_schema(db_path):
+    """Create the users schema in a fresh database."""
+    UserManager(db_path).init_schema()
+
+
+def timed(label, func, n):
+    """Run func n times and print calls per second."""
+    start = time.perf_counter()
+    for i in range(n):
+        func(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {n / elapsed:>12,.0f} ops/s")
+
+
+def bench_pool(tmpdir, n=2000):
+    """Compare per-call connections with the pooled mode."""
+    print("== connection pool ==")
+    for label, pool_size in (("per-call connect", None), ("pooled (size=4)", 4)):
+        db_path = os.path.join(tmpdir, f"pool_{pool_size}.db")
+        create_schema(db_path)
+        with UserManager(db_path, pool_size=pool_size) as manager:
+            timed(f"{label}: create_user", lambda i: manager.create_user("u", f"u{i}@x.com"), n)
+            timed(f"{label}: get_user", lambda i: manager.get_user(i + 1), n)
+            timed(f"{label}: user_exists", lambda i: manager.user_exists(f"u{i}@x.com"), n)
+
+
+def bench_bulk_insert(tmpdir, n=20000):
+    """Compare create_user in a loop with create_users."""
+    print("== bulk insert ==")
+    db_path = os.path.join(tmpdir, "bulk_loop.db")
+    create_schema(db_path)
+    with UserManager(db_path, pool_size=1) as manager:
+        loop_n = n // 10
+        timed("create_user loop", lambda i: manager.create_user("u", f"u{i}@x.com"), loop_n)
+
+    db_path = os.path.join(tmpdir, "bulk_many.db")
+    create_schema(db_path)
+    manager = UserManager(db_path)
+    start = time.perf_counter()
+    manager.create_users(("u", f"u{i}@x.com") for i in range(n))
+    elapsed = time.perf_counter() - start
+    print(f"{'create_users':<30} {n / elapsed:>12,.0f} ops/s")
+
+
+def bench_profiles(tmpdir, n=2000):
+    """Compare write and read throughput of each pragma profile."""
+    print("== pragma profiles ==")
+    for name in PROFILES:
+        db_path = os.path.join(tmpdir, f"profile_{name}.db")
+        create_schema(db_path)
+        with UserManager(db_path, pool_size=1, profile=name) as manager:
+            timed(f"{name}: create_user", lambda i: manager.create_user("u", f"u{i}@x.com"), n)
+            timed(f"{name}: get_user", lambda i: manager.get_user(i + 1), n)
+
+
+def bench_write_behind(tmpdir, n=5000):
+    """Compare committing each create_user with group commits."""
+    print("== write-behind ==")
+    db_path = os.path.join(tmpdir, "write_behind.db")
+    create_schema(db_path)
+    with UserManager(db_path, pool_size=1, write_behind_rows=500) as manager:
+        start = time.perf_counter()
+        futures = [manager.submit_user("u", f"u{i}@x.com") for i in range(n)]
+        manager.flush()
+        elapsed = time.perf_counter() - start
+    assert all(future.result() for future in futures)
+    print(f"{'submit_user + flush':<30} {n / elapsed:>12,.0f} ops/s")
+
+
+def bench_row_formats(tmpdir, n=1_000_000, keep=100_000):
+    """Time iter_users per million rows and measure memory per kept row."""
+    print("== row formats ==")
+    db_path = os.path.join(tmpdir, "row_formats.db")
+    create_schema(db_path)
+    manager = UserManager(db_path)
+    manager.create_users((f"User {i}", f"user{i}@x.com") for i in range(n))
+    for row_format in ROW_FORMATS:
+        start = time.perf_counter()
+        for _ in manager.iter_users(batch_size=10_000, row_format=row_format):
+            pass
+        per_million = (time.perf_counter() - start) * 1_000_000 / n
+
+        tracemalloc.start()
+        rows = list(itertools.islice(manager.iter_users(batch_size=keep, row_format=row_format), keep))
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del rows
+        print(f"{row_format:<12} {per_million:>8.2f} s/1M rows {size / keep:>10.0f} B/row")
+
+
+def bench_search(tmpdir, n=1_000_000, queries=200):
+    """Compare FTS5 search_users with a LIKE '%x%' scan."""
+    print("== name search ==")
+    db_path = os.path.join(tmpdir, "search.db")
+    create_schema(db_path)
+    with UserManager(db_path, pool_size=1, profile="bulk-load") as manager:
+        manager.create_users((f"First{i} Last{i % 1000}", f"user{i}@x.com") for i in range(n))
+        step = n // queries
+        timed("search_users (FTS5)", lambda i: manager.search_users(f"first{i * step}"), queries)
+
+        def like_scan(i):
+            with manager._connection() as conn:
+                conn.execute(
+                    "SELECT id, name, email FROM users WHERE name LIKE ? LIMIT 20",
+                    (f"%first{i * step} %",),
+                ).fetchall()
+
+        timed("LIKE '%x%' scan", like_scan, max(1, queries // 20))
+
+
+def bench_instrumentation(tmpdir, n=5000):
+    """Measure the overhead of instrumentation on cached-connection reads."""
+    print("== instrumentation ==")
+    db_path = os.path.join(tmpdir, "instrumentation.db")
+    create_schema(db_path)
+    UserManager(db_path).create_users(("u", f"u{i}@x.com") for i in range(n))
+    for label, instrument in (("disabled", False), ("enabled", True)):
+        with UserManager(db_path, pool_size=1, instrument=instrument) as manager:
+            timed(f"get_user, {label}", lambda i: manager.get_user(i + 1), n)
+    print(f"get_user stats: {manager.stats()['get_user']}")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bench_pool(tmpdir)
+        bench_bulk_insert(tmpdir)
+        bench_profiles(tmpdir)
+        bench_write_behind(tmpdir)
+        bench_row_formats(tmpdir)
+        bench_search(tmpdir)
+        bench_instrumentation(tmpdir)
@@ -0,0 +1,61 @@
+import itertools
+import sqlite3
+
+from user_manager import SchemaManager
+
+
+class MemoryDatabase:
+    """Named in-memory database that lives until close() is called.
+
+    path is a shared-cache URI, so it can be passed to UserManager as db_path
+    and every connection opened on it sees the same data.
+    """
+
+    _names = itertools.count()
+
+    def __init__(self):
+        self.path = f"file:fixture_{next(self._names)}?mode=memory&cache=shared"
+        self._keeper = sqlite3.connect(self.path, uri=True, check_same_thread=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Drop the database by closing the last connection holding it."""
+        self._keeper.close()
+
+
+class TemplateDatabase:
+    """Schema and seed rows built once, copied into each test with the backup API.
+
+    Running migrations and inserting seed data costs far more than copying
+    the finished pages, so tests clone this template instead of rebuilding.
+    """
+
+    def __init__(self, users=(), migrations=None):
+        """Build template with users as (name, email) pairs."""
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        SchemaManager(migrations).migrate(self.conn)
+        with self.conn:
+            self.conn.executemany("INSERT INTO users (name, email) VALUES (?, ?)", users)
+
+    def close(self):
+        self.conn.close()
+
+    def clone_to(self, path):
+        """Copy template into database file path, replacing its content. Returns path."""
+        target = sqlite3.connect(path)
+        try:
+            self.conn.backup(target)
+        finally:
+            target.close()
+        return path
+
+    def clone_in_memory(self):
+        """Copy template into a new MemoryDatabase."""
+        database = MemoryDatabase()
+        self.conn.backup(database._keeper)
+        return database
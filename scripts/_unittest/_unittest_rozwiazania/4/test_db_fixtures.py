@@ -0,0 +1,58 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from db_fixtures import TemplateDatabase
+from user_manager import SchemaManager, UserManager
+
+
+class TestTemplateDatabase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Build seeded template once for all tests."""
+        cls.template = TemplateDatabase(users=[("John Doe", "john@test.com")])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.template.close()
+
+    def test_clone_to_file_contains_schema_and_seed(self):
+        """Test that a file clone is migrated and seeded."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = self.template.clone_to(os.path.join(tmpdir, "users.db"))
+            conn = sqlite3.connect(path)
+            version = SchemaManager().current_version(conn)
+            conn.close()
+
+            self.assertEqual(version, SchemaManager().latest_version)
+            self.assertTrue(UserManager(path).user_exists("john@test.com"))
+
+    def test_memory_clone_usable_as_db_path(self):
+        """Test that UserManager works on an in-memory clone."""
+        with self.template.clone_in_memory() as database:
+            manager = UserManager(database.path)
+
+            user_id = manager.create_user("Jane Doe", "jane@test.com")
+
+            self.assertEqual(manager.get_user(user_id)["name"], "Jane Doe")
+
+    def test_clones_are_independent(self):
+        """Test that writes to one clone are not visible in another."""
+        with self.template.clone_in_memory() as first, self.template.clone_in_memory() as second:
+            UserManager(first.path).delete_user(1)
+
+            self.assertIsNone(UserManager(first.path).get_user(1))
+            self.assertIsNotNone(UserManager(second.path).get_user(1))
+
+    def test_memory_database_dropped_on_close(self):
+        """Test that closing the clone discards its data."""
+        database = self.template.clone_in_memory()
+        database.close()
+
+        with self.assertRaises(sqlite3.OperationalError):
+            UserManager(database.path).get_user(1)
+
+
+if __name__ == '__main__':
+    unittest.main()
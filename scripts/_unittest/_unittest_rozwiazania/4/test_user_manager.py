@@ -1,6 +1,28 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import patch, Mock
-from user_manager import UserManager
+from db_fixtures import TemplateDatabase
+from user_manager import (
+    AsyncUserManager, BloomFilter, ConnectionPool, LatencyHistogram, SchemaManager,
+    ShardedUserManager, UserCache, UserManager, UserRecord, UserRow, WriteBehindQueue,
+)
+
+
+def setUpModule():
+    """Build template databases once; tests get copies of them."""
+    global EMPTY_DB, SEEDED_DB
+    EMPTY_DB = TemplateDatabase()
+    SEEDED_DB = TemplateDatabase(users=[("John Doe", "john@test.com")])
+
+
+def tearDownModule():
+    EMPTY_DB.close()
+    SEEDED_DB.close()
 
 
 class TestUserManager(unittest.TestCase):
@@ -110,6 +132,23 @@ class TestUserManager(unittest.TestCase):
         # Assert
         self.assertTrue(result)
 
+    @patch('user_manager.sqlite3.connect')
+    def test_user_exists_uses_exists_probe(self, mock_connect):
+        """Test that user_exists stops at first match instead of counting."""
+        # Setup mock
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = (1,)
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        
+        # Test
+        self.manager.user_exists("john@test.com")
+        
+        # Assert
+        mock_cursor.execute.assert_called_with(
+            "SELECT EXISTS (SELECT 1 FROM users WHERE email = ?)",
+            ("john@test.com",)
+        )
+
     @patch('user_manager.sqlite3.connect')
     def test_user_exists_returns_false_when_not_found(self, mock_connect):
         """Test that user_exists returns False when email not found."""
@@ -125,5 +164,1274 @@ class TestUserManager(unittest.TestCase):
         self.assertFalse(result)
 
 
+class TestAsyncUserManager(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        """Create AsyncUserManager instance for testing."""
+        self.manager = AsyncUserManager("test.db")
+
+    async def asyncTearDown(self):
+        await self.manager.close()
+
+    @patch('user_manager.sqlite3.connect')
+    async def test_create_user_returns_user_id(self, mock_connect):
+        """Test that create_user returns the generated user ID."""
+        # Setup mock
+        mock_cursor = Mock()
+        mock_cursor.lastrowid = 123
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        
+        # Test
+        result = await self.manager.create_user("John Doe", "john@test.com")
+        
+        # Assert
+        self.assertEqual(result, 123)
+
+    @patch('user_manager.sqlite3.connect')  
+    async def test_create_user_executes_correct_sql(self, mock_connect):
+        """Test that create_user executes correct SQL with parameters."""
+        # Setup mock
+        mock_cursor = Mock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        
+        # Test
+        await self.manager.create_user("John Doe", "john@test.com")
+        
+        # Assert
+        mock_cursor.execute.assert_called_with(
+            "INSERT INTO users (name, email) VALUES (?, ?)", 
+            ("John Doe", "john@test.com")
+        )
+
+    @patch('user_manager.sqlite3.connect')
+    async def test_get_user_returns_user_dict(self, mock_connect):
+        """Test that get_user returns user dict when user exists."""
+        # Setup mock
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = (1, "John Doe", "john@test.com")
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        
+        # Test
+        result = await self.manager.get_user(1)
+        
+        # Assert
+        expected = {"id": 1, "name": "John Doe", "email": "john@test.com"}
+        self.assertEqual(result, expected)
+
+    @patch('user_manager.sqlite3.connect')
+    async def test_get_user_returns_none_when_not_found(self, mock_connect):
+        """Test that get_user returns None when user not found."""
+        # Setup mock
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = None
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        
+        # Test
+        result = await self.manager.get_user(999)
+        
+        # Assert
+        self.assertIsNone(result)
+
+    @patch('user_manager.sqlite3.connect')
+    async def test_delete_user_returns_true_when_deleted(self, mock_connect):
+        """Test that delete_user returns True when user was deleted."""
+        # Setup mock
+        mock_cursor = Mock()
+        mock_cursor.rowcount = 1
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        
+        # Test
+        result = await self.manager.delete_user(1)
+        
+        # Assert
+        self.assertTrue(result)
+
+    @patch('user_manager.sqlite3.connect')
+    async def test_delete_user_returns_false_when_not_found(self, mock_connect):
+        """Test that delete_user returns False when user not found."""
+        # Setup mock
+        mock_cursor = Mock()
+        mock_cursor.rowcount = 0
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        
+        # Test
+        result = await self.manager.delete_user(999)
+        
+        # Assert
+        self.assertFalse(result)
+
+    @patch('user_manager.sqlite3.connect')
+    async def test_user_exists_returns_true_when_found(self, mock_connect):
+        """Test that user_exists returns True when email found."""
+        # Setup mock
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = (1,)
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        
+        # Test
+        result = await self.manager.user_exists("john@test.com")
+        
+        # Assert
+        self.assertTrue(result)
+
+    @patch('user_manager.sqlite3.connect')
+    async def test_user_exists_uses_exists_probe(self, mock_connect):
+        """Test that user_exists stops at first match instead of counting."""
+        # Setup mock
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = (1,)
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        
+        # Test
+        await self.manager.user_exists("john@test.com")
+        
+        # Assert
+        mock_cursor.execute.assert_called_with(
+            "SELECT EXISTS (SELECT 1 FROM users WHERE email = ?)",
+            ("john@test.com",)
+        )
+
+    @patch('user_manager.sqlite3.connect')
+    async def test_user_exists_returns_false_when_not_found(self, mock_connect):
+        """Test that user_exists returns False when email not found."""
+        # Setup mock
+        mock_cursor = Mock()
+        mock_cursor.fetchone.return_value = (0,)
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        
+        # Test
+        result = await self.manager.user_exists("notfound@test.com")
+        
+        # Assert
+        self.assertFalse(result)
+
+    async def test_concurrent_identical_reads_are_coalesced(self):
+        """Test that concurrent get_user calls for one ID share a query."""
+        release = threading.Event()
+
+        def slow_get_user(user_id):
+            release.wait()
+            return {"id": user_id, "name": "John Doe", "email": "john@test.com"}
+
+        self.manager.manager.get_user = Mock(side_effect=slow_get_user)
+
+        pending = asyncio.gather(*(self.manager.get_user(1) for _ in range(5)))
+        await asyncio.sleep(0)
+        release.set()
+        results = await pending
+
+        self.manager.manager.get_user.assert_called_once_with(1)
+        self.assertEqual(len(results), 5)
+        self.assertIsNot(results[0], results[1])
+
+    async def test_read_after_awaited_write_is_not_coalesced(self):
+        """Test that a read issued after a write sees the write's effect."""
+        row = {"id": 1, "name": "John Doe", "email": "john@test.com"}
+        release = threading.Event()
+        calls = []
+
+        def get_user(user_id):
+            calls.append(user_id)
+            if len(calls) == 1:
+                release.wait()
+                return row
+            return None
+
+        self.manager.manager.get_user = Mock(side_effect=get_user)
+        self.manager.manager.delete_user = Mock(return_value=True)
+
+        first = asyncio.ensure_future(self.manager.get_user(1))
+        while not calls:
+            await asyncio.sleep(0.001)
+        loop = asyncio.get_running_loop()
+        loop.call_soon(release.set)
+        # keep the loop busy so the read and the delete are delivered together
+        loop.call_soon(time.sleep, 0.02)
+        self.assertTrue(await self.manager.delete_user(1))
+
+        self.assertIsNone(await self.manager.get_user(1))
+        self.assertEqual(await first, row)
+
+    async def test_worker_survives_caller_loop_closing(self):
+        """Test that a result for a closed event loop does not stop the worker."""
+        release = threading.Event()
+        self.manager.manager.delete_user = Mock(side_effect=lambda user_id: release.wait())
+        self.manager.manager.create_user = Mock(return_value=7)
+
+        async def abandoned_call():
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(self.manager.delete_user(1), 0.01)
+
+        caller = threading.Thread(target=asyncio.run, args=(abandoned_call(),))
+        caller.start()
+        caller.join()
+        release.set()
+
+        self.assertEqual(
+            await asyncio.wait_for(self.manager.create_user("John Doe", "john@test.com"), 1), 7
+        )
+
+    async def test_errors_propagate_to_caller(self):
+        """Test that exceptions raised on the worker reach the awaiting code."""
+        self.manager.manager.delete_user = Mock(side_effect=sqlite3.OperationalError("locked"))
+
+        with self.assertRaises(sqlite3.OperationalError):
+            await self.manager.delete_user(1)
+
+    async def test_call_after_close_raises_error(self):
+        """Test that a closed facade rejects new calls."""
+        await self.manager.close()
+
+        with self.assertRaises(RuntimeError):
+            await self.manager.create_user("John Doe", "john@test.com")
+
+    async def test_call_during_close_raises_error(self):
+        """Test that a call made while close() is pending fails instead of hanging."""
+        closing = asyncio.ensure_future(self.manager.close())
+        await asyncio.sleep(0)
+
+        with self.assertRaises(RuntimeError):
+            await asyncio.wait_for(self.manager.create_user("John Doe", "john@test.com"), 1)
+        await closing
+
+
+class TestSchemaManager(unittest.TestCase):
+
+    def setUp(self):
+        """Create in-memory database connection."""
+        self.conn = sqlite3.connect(":memory:")
+        self.schema = SchemaManager()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_migrate_applies_all_versions(self):
+        """Test that migrate brings a new database to the latest version."""
+        version = self.schema.migrate(self.conn)
+
+        self.assertEqual(version, self.schema.latest_version)
+        self.assertEqual(self.schema.current_version(self.conn), version)
+
+    def test_migrate_is_idempotent(self):
+        """Test that running migrate twice changes nothing."""
+        self.schema.migrate(self.conn)
+
+        self.assertEqual(self.schema.migrate(self.conn), self.schema.latest_version)
+
+    def test_search_index_built_for_existing_rows(self):
+        """Test that the FTS migration indexes users created before it."""
+        self.schema.migrate(self.conn, target=2)
+        self.conn.execute("INSERT INTO users (name, email) VALUES ('John', 'j@test.com')")
+        self.conn.commit()
+
+        self.schema.migrate(self.conn)
+
+        match = self.conn.execute("SELECT rowid FROM users_fts WHERE users_fts MATCH 'john'")
+        self.assertEqual(match.fetchall(), [(1,)])
+
+    def test_migrate_stops_at_target(self):
+        """Test that migrate does not go past the target version."""
+        self.assertEqual(self.schema.migrate(self.conn, target=1), 1)
+
+    def test_email_index_is_unique(self):
+        """Test that duplicate emails are rejected after migration."""
+        self.schema.migrate(self.conn)
+        self.conn.execute("INSERT INTO users (name, email) VALUES ('A', 'a@test.com')")
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.conn.execute("INSERT INTO users (name, email) VALUES ('B', 'a@test.com')")
+
+    def test_user_exists_query_uses_email_index(self):
+        """Test that the email lookup is an index search, not a scan."""
+        self.schema.migrate(self.conn)
+
+        plan = self.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT EXISTS (SELECT 1 FROM users WHERE email = ?)",
+            ("a@test.com",),
+        ).fetchall()
+
+        self.assertTrue(any("idx_users_email" in row[-1] for row in plan))
+
+    def test_migration_applied_concurrently_is_skipped(self):
+        """Test that a migration applied after the first version read is not rerun."""
+        schema = SchemaManager(SchemaManager.MIGRATIONS + [
+            (99, ["ALTER TABLE users ADD COLUMN age INTEGER"]),
+        ])
+        schema.migrate(self.conn)
+        stale = self.schema.latest_version
+
+        with patch.object(schema, "current_version", side_effect=[stale, 99]):
+            self.assertEqual(schema.migrate(self.conn), 99)
+
+        self.assertEqual(schema.current_version(self.conn), 99)
+
+    def test_failed_migration_keeps_previous_version(self):
+        """Test that a failing migration is rolled back as a whole."""
+        schema = SchemaManager(SchemaManager.MIGRATIONS + [
+            (99, ["CREATE TABLE extra (x)", "NOT VALID SQL"]),
+        ])
+
+        with self.assertRaises(sqlite3.OperationalError):
+            schema.migrate(self.conn)
+
+        self.assertEqual(schema.current_version(self.conn), self.schema.latest_version)
+        tables = [r[0] for r in self.conn.execute("SELECT name FROM sqlite_master")]
+        self.assertNotIn("extra", tables)
+
+
+class TestBulkOperations(unittest.TestCase):
+
+    def setUp(self):
+        """Create manager on an in-memory copy of the template database."""
+        self.database = EMPTY_DB.clone_in_memory()
+        self.db_path = self.database.path
+        self.manager = UserManager(self.db_path)
+
+    def tearDown(self):
+        self.database.close()
+
+    def test_create_users_returns_consecutive_ids(self):
+        """Test that create_users returns the range of generated IDs."""
+        self.manager.create_user("First", "first@test.com")
+
+        ids = self.manager.create_users(
+            ((f"User {i}", f"user{i}@test.com") for i in range(5)), batch_size=2
+        )
+
+        self.assertEqual(ids, range(2, 7))
+        self.assertEqual(self.manager.get_user(6)["email"], "user4@test.com")
+
+    def test_create_users_with_empty_input(self):
+        """Test that empty input returns an empty range."""
+        ids = self.manager.create_users([])
+
+        self.assertEqual(len(ids), 0)
+
+    def test_create_users_rolls_back_on_error(self):
+        """Test that a failing row rolls back the whole import."""
+        rows = [("John Doe", "john@test.com"), ("No Email", None)]
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.manager.create_users(rows, batch_size=1)
+
+        self.assertFalse(self.manager.user_exists("john@test.com"))
+
+    def test_create_users_rejects_invalid_batch_size(self):
+        """Test that batch_size below one raises ValueError."""
+        with self.assertRaises(ValueError):
+            self.manager.create_users([], batch_size=0)
+
+    def test_get_or_create_user_creates_missing_user(self):
+        """Test that a new email is inserted and reported as created."""
+        user_id, created = self.manager.get_or_create_user("John Doe", "john@test.com")
+
+        self.assertTrue(created)
+        self.assertEqual(self.manager.get_user(user_id)["email"], "john@test.com")
+
+    def test_get_or_create_user_returns_existing_user(self):
+        """Test that an existing email returns its ID without inserting."""
+        existing_id = self.manager.create_user("John Doe", "john@test.com")
+
+        user_id, created = self.manager.get_or_create_user("Other Name", "john@test.com")
+
+        self.assertFalse(created)
+        self.assertEqual(user_id, existing_id)
+        self.assertEqual(self.manager.get_user(user_id)["name"], "John Doe")
+
+    def test_get_or_create_user_is_atomic_under_concurrency(self):
+        """Test that racing callers create exactly one user."""
+        manager = UserManager(self.db_path, thread_local=True)
+        results = []
+
+        def worker():
+            results.append(manager.get_or_create_user("John Doe", "john@test.com"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        manager.close()
+
+        self.assertEqual(len({user_id for user_id, _ in results}), 1)
+        self.assertEqual(sum(created for _, created in results), 1)
+
+    def test_search_users_matches_name_words(self):
+        """Test that search_users finds users by words of their name."""
+        self.manager.create_users([
+            ("John Smith", "john@test.com"),
+            ("Jane Smith", "jane@test.com"),
+            ("Johnny Cash", "johnny@test.com"),
+        ])
+
+        names = {user["name"] for user in self.manager.search_users("smith")}
+
+        self.assertEqual(names, {"John Smith", "Jane Smith"})
+
+    def test_search_users_prefix_query(self):
+        """Test that the last word matches as a prefix unless disabled."""
+        self.manager.create_users([("John Smith", "john@test.com"), ("Johnny Cash", "j@test.com")])
+
+        self.assertEqual(len(self.manager.search_users("joh")), 2)
+        self.assertEqual(self.manager.search_users("joh", prefix=False), [])
+
+    def test_search_users_ranks_better_match_first(self):
+        """Test that results are ordered by FTS5 rank."""
+        self.manager.create_users([
+            ("Anna Maria Lee", "anna@test.com"),
+            ("Lee Lee", "lee@test.com"),
+        ])
+
+        self.assertEqual(self.manager.search_users("lee")[0]["name"], "Lee Lee")
+
+    def test_search_index_follows_deletes(self):
+        """Test that deleted users disappear from search results."""
+        user_id = self.manager.create_user("John Smith", "john@test.com")
+
+        self.manager.delete_user(user_id)
+
+        self.assertEqual(self.manager.search_users("john"), [])
+
+    def test_search_users_treats_syntax_literally(self):
+        """Test that FTS5 operators in user input do not raise errors."""
+        self.manager.create_user("John Smith", "john@test.com")
+
+        self.assertEqual(self.manager.search_users('john OR "NEAR(x'), [])
+        self.assertEqual(self.manager.search_users("   "), [])
+
+    def test_delete_users_returns_removed_ids(self):
+        """Test that delete_users reports exactly the IDs it removed."""
+        self.manager.create_users((f"User {i}", f"user{i}@test.com") for i in range(6))
+
+        deleted = self.manager.delete_users([5, 1, 3, 999, 1], chunk_size=2)
+
+        self.assertEqual(deleted, [1, 3, 5])
+        self.assertEqual([user["id"] for user in self.manager.iter_users()], [2, 4, 6])
+
+    def test_delete_users_where_matches_domain_only(self):
+        """Test that delete_users_where removes one email domain."""
+        self.manager.create_users([
+            ("A", "a@gone.com"), ("B", "b@keep.com"), ("C", "c@GONE.com"), ("D", "d@xgone.com"),
+        ])
+
+        deleted = self.manager.delete_users_where(email_domain="gone.com")
+
+        self.assertEqual(deleted, [1, 3])
+
+    def test_delete_users_where_escapes_wildcards(self):
+        """Test that LIKE wildcards in the domain are matched literally."""
+        self.manager.create_users([("A", "a@x_y.com"), ("B", "b@xzy.com")])
+
+        self.assertEqual(self.manager.delete_users_where(email_domain="x_y.com"), [1])
+
+    def test_delete_users_updates_search_index(self):
+        """Test that bulk-deleted users leave the FTS index."""
+        self.manager.create_users([("John Smith", "john@test.com")])
+
+        self.manager.delete_users([1])
+
+        self.assertEqual(self.manager.search_users("john"), [])
+
+    def test_get_users_maps_ids_across_chunks(self):
+        """Test that get_users resolves IDs split over several queries."""
+        self.manager.create_users((f"User {i}", f"user{i}@test.com") for i in range(10))
+
+        result = self.manager.get_users([3, 1, 10, 7], chunk_size=3)
+
+        self.assertEqual(list(result), [3, 1, 10, 7])
+        self.assertEqual(result[10], {"id": 10, "name": "User 9", "email": "user9@test.com"})
+
+    def test_get_users_reports_missing_ids_as_none(self):
+        """Test that unknown IDs are present in the result with None."""
+        self.manager.create_user("John Doe", "john@test.com")
+
+        result = self.manager.get_users([1, 999])
+
+        self.assertIsNotNone(result[1])
+        self.assertIsNone(result[999])
+
+    def test_get_users_rejects_chunk_above_parameter_limit(self):
+        """Test that chunk_size above the SQLite parameter limit is refused."""
+        with self.assertRaises(ValueError):
+            self.manager.get_users([1], chunk_size=10000)
+
+    def test_iter_users_yields_all_users_in_id_order(self):
+        """Test that iter_users pages through every user."""
+        self.manager.create_users((f"User {i}", f"user{i}@test.com") for i in range(7))
+
+        ids = [user["id"] for user in self.manager.iter_users(batch_size=3)]
+
+        self.assertEqual(ids, list(range(1, 8)))
+
+    def test_iter_users_resumes_after_id(self):
+        """Test that iteration continues from a checkpoint ID."""
+        self.manager.create_users((f"User {i}", f"user{i}@test.com") for i in range(5))
+
+        users = list(self.manager.iter_users(batch_size=2, after_id=3))
+
+        self.assertEqual([user["id"] for user in users], [4, 5])
+
+    def test_row_format_chosen_per_manager(self):
+        """Test that row_format changes what read methods return."""
+        self.manager.create_user("John Doe", "john@test.com")
+        manager = UserManager(self.db_path, row_format="namedtuple")
+
+        user = manager.get_user(1)
+
+        self.assertEqual(user, UserRow(1, "John Doe", "john@test.com"))
+        self.assertEqual(user.email, "john@test.com")
+
+    def test_row_format_overridden_per_call(self):
+        """Test that each read method accepts its own row_format."""
+        self.manager.create_user("John Doe", "john@test.com")
+        expected = {
+            "tuple": (1, "John Doe", "john@test.com"),
+            "record": UserRecord(1, "John Doe", "john@test.com"),
+        }
+
+        for row_format, row in expected.items():
+            with self.subTest(row_format=row_format):
+                self.assertEqual(self.manager.get_user(1, row_format=row_format), row)
+                self.assertEqual(self.manager.get_users([1], row_format=row_format)[1], row)
+                self.assertEqual(list(self.manager.iter_users(row_format=row_format)), [row])
+
+    def test_record_has_no_instance_dict(self):
+        """Test that UserRecord uses __slots__."""
+        self.assertFalse(hasattr(UserRecord(1, "a", "b"), "__dict__"))
+
+    def test_unknown_row_format_raises_error(self):
+        """Test that an unknown row_format raises ValueError."""
+        with self.assertRaisesRegex(ValueError, "Unknown row format"):
+            UserManager(self.db_path, row_format="xml")
+
+    def test_iter_users_queries_in_pages(self):
+        """Test that iter_users issues one LIMIT query per batch."""
+        self.manager.create_users((f"User {i}", f"user{i}@test.com") for i in range(4))
+
+        with patch('user_manager.sqlite3.connect', wraps=sqlite3.connect) as spy:
+            list(self.manager.iter_users(batch_size=2))
+
+        # two full pages and one empty page that ends the iteration
+        self.assertEqual(spy.call_count, 3)
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        """Create pool with mocked connection factory."""
+        self.connect = Mock(side_effect=lambda: Mock(in_transaction=False))
+        self.pool = ConnectionPool(self.connect, size=2, timeout=0.01)
+
+    def test_released_connection_is_reused(self):
+        """Test that a released connection is handed out again."""
+        conn = self.pool.acquire()
+        self.pool.release(conn)
+
+        self.assertIs(self.pool.acquire(), conn)
+        self.assertEqual(self.connect.call_count, 1)
+
+    def test_acquire_times_out_when_pool_exhausted(self):
+        """Test that acquire raises TimeoutError above the size limit."""
+        self.pool.acquire()
+        self.pool.acquire()
+
+        with self.assertRaises(TimeoutError):
+            self.pool.acquire()
+
+    def test_unhealthy_connection_is_replaced(self):
+        """Test that a connection failing the health check is discarded."""
+        broken = self.pool.acquire()
+        self.pool.release(broken)
+        broken.execute.side_effect = sqlite3.ProgrammingError("closed")
+
+        conn = self.pool.acquire()
+
+        self.assertIsNot(conn, broken)
+        broken.close.assert_called_once()
+
+    def test_release_rolls_back_open_transaction(self):
+        """Test that release rolls back a transaction left open."""
+        conn = self.pool.acquire()
+        conn.in_transaction = True
+
+        self.pool.release(conn)
+
+        conn.rollback.assert_called_once()
+
+    def test_discarded_connection_wakes_waiter(self):
+        """Test that a slot freed by a failed release is handed to a waiter."""
+        pool = ConnectionPool(self.connect, size=1, timeout=5)
+        conn = pool.acquire()
+        conn.in_transaction = True
+        conn.rollback.side_effect = sqlite3.OperationalError("disk I/O error")
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(pool.acquire()))
+        waiter.start()
+        time.sleep(0.05)
+
+        start = time.monotonic()
+        pool.release(conn)
+        waiter.join()
+
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertIsNot(result[0], conn)
+
+    def test_close_closes_idle_connections(self):
+        """Test that close() closes idle connections and rejects acquire."""
+        conn = self.pool.acquire()
+        self.pool.release(conn)
+
+        self.pool.close()
+
+        conn.close.assert_called_once()
+        with self.assertRaises(RuntimeError):
+            self.pool.acquire()
+
+
+class FileUserManagerTestCase(unittest.TestCase):
+    """Base for tests of a UserManager on a temporary copy of a template file."""
+
+    seeded = False
+    manager_options = {}
+
+    def setUp(self):
+        """Create manager with manager_options on a temporary database file."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.db_path = os.path.join(self.tmpdir.name, "users.db")
+        (SEEDED_DB if self.seeded else EMPTY_DB).clone_to(self.db_path)
+        self.manager = self.make_manager()
+        self.addCleanup(self.manager.close)
+
+    def make_manager(self):
+        return UserManager(self.db_path, **self.manager_options)
+
+
+class TestPooledUserManager(FileUserManagerTestCase):
+
+    manager_options = {"pool_size": 2}
+
+    def test_crud_round_trip(self):
+        """Test create, get, exists and delete on a pooled manager."""
+        user_id = self.manager.create_user("John Doe", "john@test.com")
+
+        self.assertEqual(
+            self.manager.get_user(user_id),
+            {"id": user_id, "name": "John Doe", "email": "john@test.com"},
+        )
+        self.assertTrue(self.manager.user_exists("john@test.com"))
+        self.assertTrue(self.manager.delete_user(user_id))
+        self.assertIsNone(self.manager.get_user(user_id))
+
+    def test_calls_reuse_connection(self):
+        """Test that repeated calls do not open new connections."""
+        with patch('user_manager.sqlite3.connect', wraps=sqlite3.connect) as spy:
+            self.manager.create_user("John Doe", "john@test.com")
+            self.manager.user_exists("john@test.com")
+            self.manager.get_user(1)
+
+        self.assertEqual(spy.call_count, 1)
+
+    def test_profile_pragmas_applied_to_connections(self):
+        """Test that the selected profile configures new connections."""
+        with UserManager(self.db_path, pool_size=1, profile="balanced") as manager:
+            with manager._connection() as conn:
+                journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+                synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+
+        self.assertEqual(journal_mode, "wal")
+        self.assertEqual(synchronous, 1)
+
+    def test_custom_pragmas_dict_is_accepted(self):
+        """Test that profile may be given as a dict of pragmas."""
+        manager = UserManager(self.db_path, profile={"cache_size": -1234})
+
+        with manager._connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -1234)
+
+    def test_unknown_profile_raises_error(self):
+        """Test that an unknown profile name raises ValueError."""
+        with self.assertRaisesRegex(ValueError, "Unknown profile"):
+            UserManager(self.db_path, profile="turbo")
+
+    def test_context_manager_closes_pool(self):
+        """Test that leaving the with-block closes the pool."""
+        with UserManager(self.db_path, pool_size=1) as manager:
+            manager.user_exists("john@test.com")
+
+        with self.assertRaises(RuntimeError):
+            manager.user_exists("john@test.com")
+
+
+class TestThreadLocalUserManager(FileUserManagerTestCase):
+
+    manager_options = {"thread_local": True}
+
+    def run_in_thread(self, func):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(func()))
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_each_thread_gets_its_own_connection(self):
+        """Test that reads in different threads use different connections."""
+        main_conn = self.manager._thread_connection()
+        other_conn = self.run_in_thread(self.manager._thread_connection)
+
+        self.assertIsNot(main_conn, other_conn)
+        self.assertIs(self.manager._thread_connection(), main_conn)
+
+    def test_thread_connection_closed_when_thread_exits(self):
+        """Test that a finished thread's connection is closed."""
+        conn = self.run_in_thread(self.manager._thread_connection)
+
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_writes_use_single_writer_connection(self):
+        """Test that writes from all threads share one connection."""
+        with patch('user_manager.sqlite3.connect', wraps=sqlite3.connect) as spy:
+            for i in range(3):
+                self.run_in_thread(lambda: self.manager.create_user("U", f"u{i}@test.com"))
+
+        # writes never open per-thread read connections
+        self.assertEqual(spy.call_count, 1)
+
+    def test_pool_and_thread_local_are_exclusive(self):
+        """Test that combining pool_size and thread_local raises ValueError."""
+        with self.assertRaises(ValueError):
+            UserManager(self.db_path, pool_size=2, thread_local=True)
+
+    def test_concurrent_crud_stress(self):
+        """Test many threads running create/get/exists/delete at once."""
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(20):
+                    email = f"user{n}_{i}@test.com"
+                    user_id = self.manager.create_user(f"User {n}", email)
+                    self.assertEqual(self.manager.get_user(user_id)["email"], email)
+                    self.assertTrue(self.manager.user_exists(email))
+                    if i % 2:
+                        self.assertTrue(self.manager.delete_user(user_id))
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(list(self.manager.iter_users())), 16 * 10)
+
+
+class TestShardedUserManager(unittest.TestCase):
+
+    def setUp(self):
+        """Create three-shard manager in a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = [os.path.join(self.tmpdir.name, f"shard{i}.db") for i in range(3)]
+        self.manager = ShardedUserManager(self.paths)
+        self.manager.init_schema()
+
+    def tearDown(self):
+        self.manager.close()
+        self.tmpdir.cleanup()
+
+    def create_users(self, count):
+        return [self.manager.create_user(f"User {i}", f"user{i}@test.com") for i in range(count)]
+
+    def test_user_stored_on_email_shard(self):
+        """Test that the email hash picks the shard and the ID carries it."""
+        user_id = self.manager.create_user("John Doe", "john@test.com")
+        shard_index = self.manager.shard_for_email("john@test.com")
+
+        self.assertEqual(user_id % 3, shard_index)
+        self.assertTrue(self.manager.shards[shard_index].user_exists("john@test.com"))
+
+    def test_users_spread_over_shards(self):
+        """Test that many emails land on more than one shard."""
+        ids = self.create_users(30)
+
+        self.assertEqual({user_id % 3 for user_id in ids}, {0, 1, 2})
+
+    def test_crud_by_global_id(self):
+        """Test get, exists and delete through global IDs."""
+        user_id = self.manager.create_user("John Doe", "john@test.com")
+
+        self.assertEqual(
+            self.manager.get_user(user_id),
+            {"id": user_id, "name": "John Doe", "email": "john@test.com"},
+        )
+        self.assertTrue(self.manager.user_exists("john@test.com"))
+        self.assertTrue(self.manager.delete_user(user_id))
+        self.assertIsNone(self.manager.get_user(user_id))
+
+    def test_get_or_create_user_routes_to_email_shard(self):
+        """Test that get_or_create_user finds users created on a shard."""
+        user_id = self.manager.create_user("John Doe", "john@test.com")
+
+        self.assertEqual(self.manager.get_or_create_user("John", "john@test.com"), (user_id, False))
+
+    def test_delete_users_across_shards(self):
+        """Test that delete_users removes IDs from every shard."""
+        ids = self.create_users(10)
+
+        deleted = self.manager.delete_users(ids[:6] + [9999])
+
+        self.assertEqual(deleted, sorted(ids[:6]))
+        self.assertEqual(sorted(u["id"] for u in self.manager.iter_users()), sorted(ids[6:]))
+
+    def test_get_users_across_shards(self):
+        """Test that get_users resolves IDs from every shard."""
+        ids = self.create_users(10)
+
+        result = self.manager.get_users(ids + [9999])
+
+        self.assertTrue(all(result[user_id]["id"] == user_id for user_id in ids))
+        self.assertIsNone(result[9999])
+
+    def test_iter_users_merges_shards_in_id_order(self):
+        """Test that iteration yields every user once, sorted by global ID."""
+        ids = self.create_users(25)
+
+        users = list(self.manager.iter_users(batch_size=4))
+
+        self.assertEqual([user["id"] for user in users], sorted(ids))
+
+    def test_iter_users_resumes_after_global_id(self):
+        """Test that after_id applies across all shards."""
+        ids = sorted(self.create_users(25))
+
+        users = list(self.manager.iter_users(batch_size=4, after_id=ids[9]))
+
+        self.assertEqual([user["id"] for user in users], ids[10:])
+
+    def test_pool_size_option_uses_pooled_shards(self):
+        """Test that pool_size replaces the per-thread connection default."""
+        with ShardedUserManager(self.paths, pool_size=2) as manager:
+            user_id = manager.create_user("John Doe", "john@test.com")
+
+            self.assertEqual(manager.get_user(user_id)["name"], "John Doe")
+            self.assertTrue(all(shard.pool is not None for shard in manager.shards))
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_added_items_are_always_found(self):
+        """Test that the filter has no false negatives."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        emails = [f"user{i}@test.com" for i in range(1000)]
+        for email in emails:
+            bloom.add(email)
+
+        self.assertTrue(all(email in bloom for email in emails))
+
+    def test_false_positive_rate_near_configured(self):
+        """Test that false positives stay close to error_rate at capacity."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"user{i}@test.com")
+
+        false_positives = sum(f"other{i}@test.com" in bloom for i in range(10000))
+
+        self.assertLess(false_positives / 10000, 0.03)
+
+    def test_memory_grows_with_lower_error_rate(self):
+        """Test that a stricter error rate needs more memory."""
+        loose = BloomFilter(capacity=1000, error_rate=0.1)
+        strict = BloomFilter(capacity=1000, error_rate=0.001)
+
+        self.assertGreater(strict.memory_bytes, loose.memory_bytes)
+
+    def test_invalid_error_rate_raises_error(self):
+        """Test that error_rate outside (0, 1) raises ValueError."""
+        with self.assertRaises(ValueError):
+            BloomFilter(capacity=10, error_rate=1)
+
+
+class TestBloomUserManager(FileUserManagerTestCase):
+
+    seeded = True
+    manager_options = {"pool_size": 1, "bloom_error_rate": 0.01}
+
+    def test_existing_users_loaded_on_first_check(self):
+        """Test that users present at startup are found."""
+        self.assertTrue(self.manager.user_exists("john@test.com"))
+        self.assertEqual(self.manager.bloom_stats()["items"], 1)
+
+    def test_definite_negative_skips_query(self):
+        """Test that an unknown email is answered without touching SQLite."""
+        self.manager.rebuild_bloom()
+
+        with patch.object(self.manager, "_connection") as mock_connection:
+            result = self.manager.user_exists("nobody@test.com")
+
+        self.assertFalse(result)
+        mock_connection.assert_not_called()
+        self.assertEqual(self.manager.bloom_stats()["skipped_queries"], 1)
+
+    def test_created_users_are_added(self):
+        """Test that create_user and create_users update the filter."""
+        self.manager.rebuild_bloom()
+
+        self.manager.create_user("Jane Doe", "jane@test.com")
+        self.manager.create_users([("Bob", "bob@test.com")])
+
+        self.assertTrue(self.manager.user_exists("jane@test.com"))
+        self.assertTrue(self.manager.user_exists("bob@test.com"))
+
+    def test_rebuild_drops_deleted_emails(self):
+        """Test that rebuild_bloom() forgets deleted users."""
+        self.manager.rebuild_bloom()
+        self.manager.delete_user(1)
+
+        self.manager.rebuild_bloom()
+
+        self.assertEqual(self.manager.bloom_stats()["items"], 0)
+
+    def test_rebuild_keeps_email_committed_after_scan(self):
+        """Test that a write in flight during rebuild is not lost from the filter."""
+        for first_build in (True, False):
+            with self.subTest(first_build=first_build):
+                manager = UserManager(self.db_path, pool_size=1, bloom_error_rate=0.01)
+                self.addCleanup(manager.close)
+                if not first_build:
+                    manager.rebuild_bloom()
+                email = f"late{first_build}@test.com"
+
+                with manager._bloom_writing([email]):
+                    manager.rebuild_bloom()
+                    with sqlite3.connect(self.db_path) as conn:
+                        conn.execute("INSERT INTO users (name, email) VALUES ('Late', ?)", (email,))
+                    conn.close()
+
+                self.assertTrue(manager.user_exists(email))
+
+    def test_concurrent_first_checks_scan_once(self):
+        """Test that threads racing on the lazy first build share one scan."""
+        rebuild = self.manager._rebuild_bloom
+
+        def slow_rebuild(*args):
+            time.sleep(0.05)
+            rebuild(*args)
+
+        with patch.object(self.manager, "_rebuild_bloom", side_effect=slow_rebuild) as spy:
+            threads = [
+                threading.Thread(target=self.manager.user_exists, args=("john@test.com",))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        spy.assert_called_once()
+
+    def test_bloom_stats_reports_memory(self):
+        """Test that bloom_stats() includes the memory footprint."""
+        self.manager.rebuild_bloom(capacity=10000)
+
+        self.assertGreater(self.manager.bloom_stats()["memory_bytes"], 10000)
+
+    def test_rebuild_without_bloom_raises_error(self):
+        """Test that rebuild_bloom() requires bloom_error_rate."""
+        with self.assertRaises(RuntimeError):
+            UserManager(self.db_path).rebuild_bloom()
+
+
+class TestWriteBehindQueue(unittest.TestCase):
+
+    def setUp(self):
+        """Create queue with a recording batch writer."""
+        self.batches = []
+        self.queue = WriteBehindQueue(self.write_batch, max_rows=3, max_delay=60)
+
+    def tearDown(self):
+        self.queue.close()
+
+    def write_batch(self, items):
+        self.batches.append(list(items))
+        return [item * 10 for item in items]
+
+    def test_full_batch_is_written_without_waiting(self):
+        """Test that reaching max_rows triggers a write."""
+        futures = [self.queue.submit(i) for i in range(3)]
+
+        self.assertEqual([f.result(timeout=1) for f in futures], [0, 10, 20])
+        self.assertEqual(self.batches, [[0, 1, 2]])
+
+    def test_partial_batch_written_after_delay(self):
+        """Test that a partial batch is written once max_delay passes."""
+        queue = WriteBehindQueue(self.write_batch, max_rows=100, max_delay=0.01)
+
+        future = queue.submit(4)
+
+        self.assertEqual(future.result(timeout=1), 40)
+        queue.close()
+
+    def test_flush_writes_partial_batch(self):
+        """Test that flush() does not wait for the delay."""
+        future = self.queue.submit(1)
+
+        self.queue.flush()
+
+        self.assertTrue(future.done())
+
+    def test_exception_result_fails_only_that_future(self):
+        """Test that an Exception in results fails one future."""
+        queue = WriteBehindQueue(lambda items: [1, ValueError("bad")], max_rows=2)
+
+        ok, bad = queue.submit("a"), queue.submit("b")
+
+        self.assertEqual(ok.result(timeout=1), 1)
+        with self.assertRaises(ValueError):
+            bad.result(timeout=1)
+        queue.close()
+
+    def test_close_writes_pending_items_and_rejects_new(self):
+        """Test that close() loses nothing and refuses further submits."""
+        future = self.queue.submit(7)
+
+        self.queue.close()
+
+        self.assertEqual(future.result(timeout=0), 70)
+        with self.assertRaises(RuntimeError):
+            self.queue.submit(8)
+
+
+class TestWriteBehindUserManager(FileUserManagerTestCase):
+
+    manager_options = {"pool_size": 1, "write_behind_rows": 10}
+
+    def test_submitted_users_share_one_commit(self):
+        """Test that a batch of submitted users is committed once."""
+        queue = self.manager.write_behind
+        with patch.object(queue, "write_batch", wraps=queue.write_batch) as spy:
+            futures = [self.manager.submit_user("U", f"u{i}@test.com") for i in range(10)]
+            ids = [future.result(timeout=1) for future in futures]
+
+        spy.assert_called_once()
+        self.assertEqual(ids, list(range(1, 11)))
+
+    def test_duplicate_email_fails_only_its_future(self):
+        """Test that a constraint violation does not sink the batch."""
+        first = self.manager.submit_user("John Doe", "john@test.com")
+        duplicate = self.manager.submit_user("Copy", "john@test.com")
+        self.manager.flush()
+
+        self.assertEqual(first.result(), 1)
+        with self.assertRaises(sqlite3.IntegrityError):
+            duplicate.result()
+
+    def test_close_commits_queued_users(self):
+        """Test that close() writes users still waiting in the queue."""
+        self.manager.submit_user("John Doe", "john@test.com")
+
+        self.manager.close()
+
+        self.assertTrue(UserManager(self.db_path).user_exists("john@test.com"))
+
+    def test_submit_without_write_behind_raises_error(self):
+        """Test that submit_user() requires write_behind_rows."""
+        with self.assertRaises(RuntimeError):
+            UserManager(self.db_path).submit_user("John Doe", "john@test.com")
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles_follow_distribution(self):
+        """Test that p50 and p99 land in the buckets of the samples."""
+        histogram = LatencyHistogram()
+        for _ in range(98):
+            histogram.add(0.001)
+        histogram.add(1.0)
+        histogram.add(1.0)
+
+        self.assertAlmostEqual(histogram.percentile(50), 0.001, delta=0.0003)
+        self.assertAlmostEqual(histogram.percentile(99), 1.0, delta=0.2)
+
+    def test_empty_histogram_returns_zero(self):
+        """Test that percentiles of no samples are zero."""
+        self.assertEqual(LatencyHistogram().percentile(95), 0.0)
+
+
+class TestInstrumentedUserManager(FileUserManagerTestCase):
+
+    def make_manager(self):
+        self.events = []
+        return UserManager(self.db_path, stats_sink=self.events.append)
+
+    def test_stats_counts_calls_and_rows(self):
+        """Test that stats() reports calls and rows per method."""
+        self.manager.create_users([("A", "a@test.com"), ("B", "b@test.com")])
+        self.manager.get_user(1)
+        self.manager.get_user(999)
+        self.manager.get_users([1, 2])
+
+        stats = self.manager.stats()
+
+        self.assertEqual(stats["get_user"]["calls"], 2)
+        self.assertEqual(stats["get_user"]["rows"], 1)
+        self.assertEqual(stats["get_users"]["rows"], 2)
+
+    def test_bookkeeping_queries_are_not_counted_as_rows(self):
+        """Test that MAX(id) and EXISTS probes do not add to rows touched."""
+        self.manager.create_users([("A", "a@test.com"), ("B", "b@test.com"), ("C", "c@test.com")])
+        self.manager.user_exists("a@test.com")
+
+        stats = self.manager.stats()
+
+        self.assertEqual(stats["create_users"]["rows"], 3)
+        self.assertEqual(stats["user_exists"]["rows"], 0)
+
+    def test_stats_splits_connect_execute_commit(self):
+        """Test that phase timings and percentiles are recorded."""
+        self.manager.create_user("John Doe", "john@test.com")
+
+        stats = self.manager.stats()["create_user"]
+
+        for key in ("connect", "execute", "commit", "p50", "p95", "p99"):
+            with self.subTest(key=key):
+                self.assertGreater(stats[key], 0)
+        self.assertLessEqual(stats["connect"] + stats["execute"] + stats["commit"],
+                             stats["seconds"])
+
+    def test_sink_receives_each_call(self):
+        """Test that the sink callback gets one event per call."""
+        self.manager.user_exists("john@test.com")
+
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(self.events[0]["method"], "user_exists")
+
+    def test_errors_are_counted(self):
+        """Test that a failing call is recorded with its error."""
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.manager.create_user("No Email", None)
+
+        self.assertEqual(self.manager.stats()["create_user"]["errors"], 1)
+        self.assertEqual(self.events[0]["error"], "IntegrityError")
+
+    def test_generator_measured_when_stopped_early(self):
+        """Test that a partly consumed iter_users is recorded without error."""
+        self.manager.create_users((f"U{i}", f"u{i}@test.com") for i in range(5))
+        users = self.manager.iter_users(batch_size=2)
+
+        next(users)
+        users.close()
+
+        self.assertEqual(self.events[-1]["method"], "iter_users")
+        self.assertIsNone(self.events[-1]["error"])
+
+    def test_stats_is_none_when_disabled(self):
+        """Test that stats() is None without instrumentation."""
+        self.assertIsNone(UserManager(self.db_path).stats())
+
+
+class TestUserCache(unittest.TestCase):
+
+    def setUp(self):
+        """Create small cache with controllable clock."""
+        self.now = 0.0
+        self.cache = UserCache(max_size=2, ttl=10, clock=lambda: self.now)
+
+    def test_get_counts_hits_and_misses(self):
+        """Test that get() reports found flag and updates counters."""
+        self.cache.put(1, "John")
+
+        self.assertEqual(self.cache.get(1), (True, "John"))
+        self.assertEqual(self.cache.get(2), (False, None))
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_cached_none_is_a_hit(self):
+        """Test that a cached None is distinguished from a missing entry."""
+        self.cache.put(1, None)
+
+        self.assertEqual(self.cache.get(1), (True, None))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the LRU entry goes first when the cache is full."""
+        self.cache.put(1, "a")
+        self.cache.put(2, "b")
+        self.cache.get(1)
+        self.cache.put(3, "c")
+
+        self.assertFalse(self.cache.get(2)[0])
+        self.assertTrue(self.cache.get(1)[0])
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_entry_expires_after_ttl(self):
+        """Test that entries older than ttl are treated as missing."""
+        self.cache.put(1, "a")
+        self.now = 10
+
+        self.assertFalse(self.cache.get(1)[0])
+
+
+class TestCachedUserManager(FileUserManagerTestCase):
+
+    manager_options = {"pool_size": 1, "cache_size": 10}
+
+    def setUp(self):
+        """Create cached manager with one user on a temporary database file."""
+        super().setUp()
+        self.user_id = self.manager.create_user("John Doe", "john@test.com")
+
+    def test_repeated_get_user_hits_cache(self):
+        """Test that a second get_user is served from the cache."""
+        first = self.manager.get_user(self.user_id)
+        second = self.manager.get_user(self.user_id)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.manager.cache_stats()["hits"], 1)
+
+    def test_returned_dict_does_not_alias_cache(self):
+        """Test that mutating a returned user does not change the cache."""
+        self.manager.get_user(self.user_id)["name"] = "Changed"
+
+        self.assertEqual(self.manager.get_user(self.user_id)["name"], "John Doe")
+
+    def test_delete_user_invalidates_cache(self):
+        """Test that a deleted user is not returned from the cache."""
+        self.manager.get_user(self.user_id)
+
+        self.manager.delete_user(self.user_id)
+
+        self.assertIsNone(self.manager.get_user(self.user_id))
+
+    def test_write_from_other_manager_invalidates_cache(self):
+        """Test that commits by another instance are noticed."""
+        self.manager.get_user(self.user_id)
+
+        UserManager(self.db_path).delete_user(self.user_id)
+
+        self.assertIsNone(self.manager.get_user(self.user_id))
+
+    def test_delete_users_invalidates_cache(self):
+        """Test that bulk deletes drop cached users."""
+        self.manager.get_user(self.user_id)
+
+        self.manager.delete_users([self.user_id])
+
+        self.assertIsNone(self.manager.get_user(self.user_id))
+
+    def test_create_user_replaces_cached_miss(self):
+        """Test that a cached None is dropped once the ID is created."""
+        self.assertIsNone(self.manager.get_user(self.user_id + 1))
+
+        new_id = self.manager.create_user("Jane Doe", "jane@test.com")
+
+        self.assertEqual(self.manager.get_user(new_id)["name"], "Jane Doe")
+
+    def test_cache_stats_is_none_when_disabled(self):
+        """Test that cache_stats() is None without cache_size."""
+        self.assertIsNone(UserManager(self.db_path).cache_stats())
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,141 @@
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing, redirect_stdout
+from unittest.mock import Mock
+from db_fixtures import TemplateDatabase
+from user_manager import UserManager
+from user_transfer import detect_format, export_users, import_users, main
+
+
+class TestUserTransfer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Build empty template database once."""
+        cls.template = TemplateDatabase()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.template.close()
+
+    def setUp(self):
+        """Create manager on a copy of the template database."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = self.template.clone_to(os.path.join(self.tmpdir.name, "users.db"))
+        self.manager = UserManager(self.db_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def write_file(self, name, content):
+        with open(self.path(name), "w") as f:
+            f.write(content)
+        return self.path(name)
+
+    def test_detect_format_from_extension(self):
+        """Test that the format follows the file extension."""
+        self.assertEqual(detect_format("users.csv"), "csv")
+        self.assertEqual(detect_format("users.ndjson"), "jsonl")
+
+    def test_detect_format_rejects_unknown_extension(self):
+        """Test that an unknown extension without format raises ValueError."""
+        with self.assertRaises(ValueError):
+            detect_format("users.xml")
+
+    def test_import_csv(self):
+        """Test that CSV rows are inserted and counted."""
+        path = self.write_file("users.csv", "name,email\nJohn,john@test.com\nJane,jane@test.com\n")
+
+        summary = import_users(self.manager, path)
+
+        self.assertEqual(summary["rows"], 2)
+        self.assertEqual(summary["ids"], range(1, 3))
+        self.assertTrue(self.manager.user_exists("jane@test.com"))
+
+    def test_import_jsonl_skips_blank_lines(self):
+        """Test that JSON Lines import ignores empty lines."""
+        path = self.write_file(
+            "users.jsonl", '{"name": "John", "email": "john@test.com"}\n\n'
+        )
+
+        summary = import_users(self.manager, path)
+
+        self.assertEqual(summary["rows"], 1)
+
+    def test_export_round_trips_through_import(self):
+        """Test that exported users import into an empty database."""
+        self.manager.create_users((f"User {i}", f"user{i}@test.com") for i in range(5))
+        export_path = self.path("users.csv")
+
+        export_users(self.manager, export_path, batch_size=2)
+        target = UserManager(self.template.clone_to(self.path("copy.db")))
+        import_users(target, export_path)
+
+        self.assertEqual(list(target.iter_users()), list(self.manager.iter_users()))
+
+    def test_export_jsonl_writes_one_object_per_line(self):
+        """Test that JSON Lines export writes id, name and email."""
+        self.manager.create_user("John Doe", "john@test.com")
+        path = self.path("users.jsonl")
+
+        export_users(self.manager, path)
+
+        with open(path) as f:
+            self.assertEqual(
+                [json.loads(line) for line in f],
+                [{"id": 1, "name": "John Doe", "email": "john@test.com"}],
+            )
+
+    def test_progress_callback_called_every_n_rows(self):
+        """Test that progress is reported at the configured interval."""
+        self.manager.create_users((f"User {i}", f"user{i}@test.com") for i in range(5))
+        progress = Mock()
+
+        export_users(self.manager, self.path("users.csv"), progress=progress, progress_every=2)
+
+        self.assertEqual([c.args[0] for c in progress.call_args_list], [2, 4])
+
+    def test_main_imports_from_command_line(self):
+        """Test the command line entry point."""
+        path = self.write_file("users.csv", "name,email\nJohn,john@test.com\n")
+        db_path = self.path("cli.db")
+
+        with redirect_stdout(io.StringIO()) as out:
+            main(["import", db_path, path])
+
+        self.assertIn("imported 1 users", out.getvalue())
+        self.assertTrue(UserManager(db_path).user_exists("john@test.com"))
+
+    def test_main_leaves_journal_mode_alone_by_default(self):
+        """Test that import and export keep the file's journal mode unless asked."""
+        path = self.write_file("users.csv", "name,email\nJohn,john@test.com\n")
+        db_path = self.path("cli.db")
+
+        with redirect_stdout(io.StringIO()):
+            main(["import", db_path, path])
+            main(["export", db_path, self.path("out.jsonl")])
+
+        with closing(sqlite3.connect(db_path)) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "delete")
+
+    def test_main_bulk_load_profile_is_opt_in(self):
+        """Test that --profile bulk-load applies its pragmas to the import."""
+        path = self.write_file("users.csv", "name,email\nJohn,john@test.com\n")
+        db_path = self.path("cli.db")
+
+        with redirect_stdout(io.StringIO()):
+            main(["import", db_path, path, "--profile", "bulk-load"])
+
+        with closing(sqlite3.connect(db_path)) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+
+if __name__ == '__main__':
+    unittest.main()
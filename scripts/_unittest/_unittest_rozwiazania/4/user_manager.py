@@ -1,69 +1,1584 @@
-import sqlite3
+import asyncio
+import bisect
+import copy
+import functools
+import hashlib
+import heapq
+import inspect
+import itertools
+import math
 import os
+import queue
+import sqlite3
+import threading
+import time
+import weakref
+from collections import Counter, OrderedDict, deque, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+# Stay below SQLITE_MAX_VARIABLE_NUMBER of older SQLite builds (999)
+MAX_QUERY_PARAMS = 900
+
+UserRow = namedtuple("UserRow", ["id", "name", "email"])
+
+
+class UserRecord:
+    """Lightweight user object without a per-instance __dict__."""
+
+    __slots__ = ("id", "name", "email")
+
+    def __init__(self, id, name, email):
+        self.id = id
+        self.name = name
+        self.email = email
+
+    def __eq__(self, other):
+        if not isinstance(other, UserRecord):
+            return NotImplemented
+        return (self.id, self.name, self.email) == (other.id, other.name, other.email)
+
+    def __repr__(self):
+        return f"UserRecord(id={self.id!r}, name={self.name!r}, email={self.email!r})"
+
+
+# Converters from an (id, name, email) row to the returned representation
+ROW_FORMATS = {
+    "dict": lambda row: {"id": row[0], "name": row[1], "email": row[2]},
+    "tuple": tuple,
+    "namedtuple": UserRow._make,
+    "record": lambda row: UserRecord(*row),
+}
+
+
+def _row_converter(row_format):
+    try:
+        return ROW_FORMATS[row_format]
+    except KeyError:
+        raise ValueError(f"Unknown row format: {row_format!r}") from None
+
+
+# Pragmas applied to every new connection, in order
+PROFILES = {
+    "durable": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "mmap_size": 0,
+        "cache_size": -2000,
+        "temp_store": "DEFAULT",
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 64 * 1024 * 1024,
+        "cache_size": -16000,
+        "temp_store": "MEMORY",
+    },
+    "bulk-load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+class ConnectionPool:
+    """Bounded pool of reusable SQLite connections."""
+
+    def __init__(self, connect, size=5, timeout=5.0):
+        """Initialize with connection factory, max size and acquire timeout."""
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self._idle = []
+        # notified whenever a connection is returned or a slot is freed
+        self._available = threading.Condition(threading.Lock())
+        self._opened = 0
+        self._closed = False
+
+    def acquire(self):
+        """Take an idle connection or open a new one below the size limit."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = self._take_or_reserve(deadline)
+            if conn is None:
+                try:
+                    return self.connect()
+                except Exception:
+                    self._free_slot()
+                    raise
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn):
+        """Return connection to the pool."""
+        if self._closed:
+            self._discard(conn)
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        with self._available:
+            self._idle.append(conn)
+            self._available.notify()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with-block."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close all idle connections. Borrowed ones are closed on release."""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    def _take_or_reserve(self, deadline):
+        """Pop an idle connection, or return None after reserving a new slot."""
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._opened < self.size:
+                    self._opened += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("No connection available in pool")
+                self._available.wait(remaining)
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self._free_slot()
+
+    def _free_slot(self):
+        with self._available:
+            self._opened -= 1
+            self._available.notify()
+
+
+class WriterQueue:
+    """FIFO queue handing one shared writer connection to one thread at a time."""
+
+    def __init__(self, connect):
+        """Initialize with connection factory; connection opens on first use."""
+        self.connect = connect
+        self._conn = None
+        self._lock = threading.Lock()
+        self._waiters = deque()
+        self._busy = False
+
+    @contextmanager
+    def connection(self):
+        """Wait for our turn and yield the writer connection."""
+        self._enter()
+        try:
+            if self._conn is None:
+                self._conn = self.connect()
+            try:
+                yield self._conn
+            finally:
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+        finally:
+            self._exit()
+
+    def close(self):
+        """Close the writer connection once pending writers are done."""
+        self._enter()
+        try:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        finally:
+            self._exit()
+
+    def _enter(self):
+        with self._lock:
+            if not self._busy:
+                self._busy = True
+                return
+            turn = threading.Event()
+            self._waiters.append(turn)
+        turn.wait()
+
+    def _exit(self):
+        with self._lock:
+            if self._waiters:
+                # hand over directly, so the queue stays busy and FIFO
+                self._waiters.popleft().set()
+            else:
+                self._busy = False
+
+
+class WriteBehindQueue:
+    """Collect submitted items and hand them to a writer in batches.
+
+    A background thread calls write_batch(items) once max_rows items are
+    queued or max_delay seconds after the oldest one arrived. write_batch
+    returns one result per item; an Exception instance fails that item's
+    future, any other value resolves it.
+    """
+
+    def __init__(self, write_batch, max_rows=100, max_delay=0.05):
+        if max_rows < 1:
+            raise ValueError("max_rows must be >= 1")
+        self.write_batch = write_batch
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._pending = []
+        self._oldest = None
+        self._unfinished = 0
+        self._closed = False
+        self._flush_requested = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="WriteBehindQueue", daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Queue item. Returns Future resolved when its batch is written."""
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("WriteBehindQueue is closed")
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((item, future))
+            self._unfinished += 1
+            # wake the thread to arm the delay timer or to write a full batch
+            if len(self._pending) in (1, self.max_rows):
+                self._cond.notify_all()
+        return future
+
+    def flush(self):
+        """Block until everything submitted so far is written."""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._unfinished == 0)
+
+    def close(self):
+        """Flush remaining items and stop the background thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _batch_ready(self):
+        if not self._pending:
+            return False
+        if self._closed or self._flush_requested or len(self._pending) >= self.max_rows:
+            return True
+        return time.monotonic() - self._oldest >= self.max_delay
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._batch_ready():
+                    if self._closed and not self._pending:
+                        return
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0.0, self._oldest + self.max_delay - time.monotonic())
+                    self._cond.wait(timeout)
+                batch = self._pending[:self.max_rows]
+                del self._pending[:self.max_rows]
+                self._oldest = time.monotonic() if self._pending else None
+                if not self._pending:
+                    self._flush_requested = False
+            self._write(batch)
+            with self._cond:
+                self._unfinished -= len(batch)
+                self._cond.notify_all()
+
+    def _write(self, batch):
+        futures = [future for _, future in batch]
+        try:
+            results = self.write_batch([item for item, _ in batch])
+        except BaseException as exc:
+            for future in futures:
+                future.set_exception(exc)
+            return
+        for future, result in zip(futures, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class _ThreadConnection:
+    """Holder for a per-thread connection, closed when the thread exits."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.finalizer = weakref.finalize(self, conn.close)
+
+
+class SchemaManager:
+    """Create and upgrade the users schema, tracked in PRAGMA user_version."""
+
+    MIGRATIONS = [
+        (1, [
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                email TEXT NOT NULL
+            )
+            """,
+        ]),
+        (2, [
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users (email)",
+        ]),
+        (3, [
+            # external-content FTS5 index over users.name, kept in sync by triggers
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS users_fts
+            USING fts5(name, content='users', content_rowid='id', prefix='2 3')
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+                INSERT INTO users_fts (rowid, name) VALUES (new.id, new.name);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+                INSERT INTO users_fts (users_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF name ON users BEGIN
+                INSERT INTO users_fts (users_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                INSERT INTO users_fts (rowid, name) VALUES (new.id, new.name);
+            END
+            """,
+            "INSERT INTO users_fts (users_fts) VALUES ('rebuild')",
+        ]),
+    ]
+
+    def __init__(self, migrations=None):
+        """Initialize with list of (version, statements), ascending."""
+        self.migrations = self.MIGRATIONS if migrations is None else migrations
+
+    @property
+    def latest_version(self):
+        return self.migrations[-1][0] if self.migrations else 0
+
+    def current_version(self, conn):
+        """Return schema version stored in the database."""
+        return _scalar(conn.cursor(), "PRAGMA user_version")
+
+    def migrate(self, conn, target=None):
+        """Apply pending migrations up to target. Returns resulting version.
+
+        Each migration runs in its own transaction together with the version
+        bump, so a failing step leaves the database at the previous version.
+        The version is read again under the write lock, so migrations that
+        another connection applied meanwhile are skipped.
+        """
+        target = self.latest_version if target is None else target
+        version = self.current_version(conn)
+        for number, statements in self.migrations:
+            if number <= version or number > target:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = self.current_version(conn)
+                if number <= version:
+                    conn.commit()
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {int(number)}")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            version = number
+        return version
+
+
+class UserCache:
+    """Bounded LRU cache for user lookups with optional time-to-live."""
+
+    _MISSING = object()
+
+    def __init__(self, max_size=1024, ttl=None, clock=time.monotonic):
+        """Initialize with max entries, ttl in seconds (None = no expiry)."""
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return (found, value) for key."""
+        with self._lock:
+            value, expires = self._entries.get(key, (self._MISSING, None))
+            if value is not self._MISSING and expires is not None and expires <= self.clock():
+                del self._entries[key]
+                value = self._MISSING
+            if value is self._MISSING:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def put(self, key, value):
+        """Store value, evicting the least recently used entry if full."""
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Drop a single entry."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_many(self, keys):
+        """Drop several entries under one lock acquisition."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return counters snapshot."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+
+class BloomFilter:
+    """Probabilistic set: no false negatives, configurable false positive rate."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        """Size the bit array for capacity items at the given error rate."""
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def memory_bytes(self):
+        return len(self.bits)
+
+
+class LatencyHistogram:
+    """Fixed log-scale latency buckets (1us to ~2min) with percentile estimates."""
+
+    BOUNDS = [1e-6 * 2 ** (i / 4) for i in range(4 * 27)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.total = 0
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.total += 1
+
+    def percentile(self, p):
+        """Return upper bound of the bucket holding the p-th percentile."""
+        if not self.total:
+            return 0.0
+        rank = p / 100 * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.BOUNDS[min(index, len(self.BOUNDS) - 1)]
+        return self.BOUNDS[-1]
+
+
+class Instrumentation:
+    """Collect per-method calls, latency, rows and connect/execute/commit time."""
+
+    PHASES = ("connect", "execute", "commit")
+
+    def __init__(self, sink=None):
+        """Initialize with optional sink called with every finished call."""
+        self.sink = sink
+        self._methods = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def current(self):
+        """Return the record of the call running in this thread, if any."""
+        return getattr(self._local, "call", None)
+
+    @contextmanager
+    def measure(self, method):
+        """Time a with-block as one call of method."""
+        call = self._start(method)
+        previous = self.current()
+        self._local.call = call
+        start = time.perf_counter()
+        try:
+            yield call
+        except BaseException as exc:
+            call["error"] = type(exc).__name__
+            raise
+        finally:
+            call["seconds"] += time.perf_counter() - start
+            self._local.call = previous
+            self._finish(call)
+
+    def measure_generator(self, method, generator):
+        """Yield from generator, timing only the work done inside it."""
+        call = self._start(method)
+        try:
+            while True:
+                with self._resumed(call):
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                yield item
+        except GeneratorExit:
+            # consumer stopped early, not an error
+            raise
+        except BaseException as exc:
+            call["error"] = type(exc).__name__
+            raise
+        finally:
+            generator.close()
+            self._finish(call)
+
+    @contextmanager
+    def _resumed(self, call):
+        previous = self.current()
+        self._local.call = call
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            call["seconds"] += time.perf_counter() - start
+            self._local.call = previous
+
+    def _start(self, method):
+        call = {"method": method, "seconds": 0.0, "rows": 0, "error": None}
+        call.update(dict.fromkeys(self.PHASES, 0.0))
+        return call
+
+    def _finish(self, call):
+        with self._lock:
+            stats = self._methods.get(call["method"])
+            if stats is None:
+                stats = self._methods[call["method"]] = {
+                    "calls": 0, "errors": 0, "rows": 0, "seconds": 0.0,
+                    "histogram": LatencyHistogram(),
+                }
+                stats.update(dict.fromkeys(self.PHASES, 0.0))
+            stats["calls"] += 1
+            stats["errors"] += call["error"] is not None
+            stats["rows"] += call["rows"]
+            stats["seconds"] += call["seconds"]
+            stats["histogram"].add(call["seconds"])
+            for phase in self.PHASES:
+                stats[phase] += call[phase]
+        if self.sink is not None:
+            self.sink(call)
+
+    def stats(self):
+        """Return snapshot: method -> counters, phase totals and p50/p95/p99."""
+        with self._lock:
+            snapshot = {}
+            for method, stats in self._methods.items():
+                entry = {key: value for key, value in stats.items() if key != "histogram"}
+                for p in (50, 95, 99):
+                    entry[f"p{p}"] = stats["histogram"].percentile(p)
+                snapshot[method] = entry
+            return snapshot
+
+
+class _InstrumentedCursor:
+    """Cursor proxy adding execute time and rows to the current call."""
+
+    def __init__(self, cursor, call):
+        self._cursor = cursor
+        self._call = call
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._call["rows"] += 1
+            yield row
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return getattr(self._cursor, method)(*args)
+        finally:
+            self._call["execute"] += time.perf_counter() - start
+
+    def execute(self, sql, parameters=()):
+        self._timed("execute", sql, parameters)
+        self._call["rows"] += max(self._cursor.rowcount, 0)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._timed("executemany", sql, seq_of_parameters)
+        self._call["rows"] += max(self._cursor.rowcount, 0)
+        return self
+
+    def fetchone(self):
+        row = self._timed("fetchone")
+        self._call["rows"] += row is not None
+        return row
+
+    def fetchall(self):
+        rows = self._timed("fetchall")
+        self._call["rows"] += len(rows)
+        return rows
+
+    def scalar(self, sql, parameters=()):
+        """Return first column of a bookkeeping query, timed but not counted as rows."""
+        self._timed("execute", sql, parameters)
+        return self._timed("fetchone")[0]
+
+
+def _scalar(cursor, sql, parameters=()):
+    """Run a one-row query such as COUNT(*) or MAX(id) and return its value."""
+    if isinstance(cursor, _InstrumentedCursor):
+        return cursor.scalar(sql, parameters)
+    cursor.execute(sql, parameters)
+    return cursor.fetchone()[0]
+
+
+class _InstrumentedConnection:
+    """Connection proxy splitting the current call into execute and commit time."""
+
+    def __init__(self, conn, call):
+        self._conn = conn
+        self._call = call
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self):
+        return _InstrumentedCursor(self._conn.cursor(), self._call)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def _timed_commit(self, method):
+        start = time.perf_counter()
+        try:
+            getattr(self._conn, method)()
+        finally:
+            self._call["commit"] += time.perf_counter() - start
+
+    def commit(self):
+        self._timed_commit("commit")
+
+    def rollback(self):
+        self._timed_commit("rollback")
+
+
+def _instrumented(func):
+    """Record calls of a UserManager method when instrumentation is on."""
+    name = func.__name__
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator_wrapper(self, *args, **kwargs):
+            if self.instrumentation is None:
+                return func(self, *args, **kwargs)
+            return self.instrumentation.measure_generator(name, func(self, *args, **kwargs))
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if self.instrumentation is None:
+            return func(self, *args, **kwargs)
+        with self.instrumentation.measure(name):
+            return func(self, *args, **kwargs)
+    return wrapper
 
 
 class UserManager:
     """Manage users in SQLite database."""
     
-    def __init__(self, db_path="users.db"):
-        """Initialize with database path."""
+    def __init__(self, db_path="users.db", pool_size=None, cache_size=None, cache_ttl=None,
+                 profile=None, thread_local=False, bloom_error_rate=None,
+                 write_behind_rows=None, write_behind_ms=50, row_format="dict",
+                 instrument=False, stats_sink=None):
+        """Initialize with database path.
+
+        Pass pool_size to reuse connections and cache_size to cache get_user()
+        results (optionally expiring after cache_ttl seconds). profile is a
+        name from PROFILES or a dict of pragmas; None keeps SQLite defaults.
+
+        thread_local=True gives every thread its own read connection and
+        funnels writes through a single WriterQueue. It defaults to the
+        "balanced" (WAL) profile so readers do not block on the writer.
+
+        bloom_error_rate enables a Bloom filter of emails that lets
+        user_exists() answer definite negatives without a query. It only sees
+        users created through this manager, so call rebuild_bloom() after
+        external writes or to drop deleted emails.
+
+        write_behind_rows enables submit_user(): inserts are queued and
+        committed together once that many rows are waiting or
+        write_behind_ms milliseconds have passed.
+
+        row_format picks how read methods return users: "dict" (default),
+        "tuple", "namedtuple" (UserRow) or "record" (UserRecord). Read
+        methods also accept row_format to override it per call.
+
+        instrument=True (or a stats_sink callback, which gets one dict per
+        finished call) records per-method latency, rows and phase timings,
+        available from stats().
+        """
+        self.instrumentation = None
+        if instrument or stats_sink is not None:
+            self.instrumentation = Instrumentation(stats_sink)
+        if pool_size and thread_local:
+            raise ValueError("pool_size and thread_local are mutually exclusive")
         self.db_path = db_path
+        self.row_format = row_format
+        self._row_factory(row_format)
+        if profile is None and thread_local:
+            profile = "balanced"
+        if isinstance(profile, str):
+            if profile not in PROFILES:
+                raise ValueError(f"Unknown profile: {profile!r}")
+            profile = PROFILES[profile]
+        self.pragmas = dict(profile or {})
+        self.pool = None
+        if pool_size:
+            self.pool = ConnectionPool(self._open_connection, size=pool_size)
+        self.writer = None
+        if thread_local:
+            self.writer = WriterQueue(self._open_connection)
+            self._local = threading.local()
+            self._thread_conns = weakref.WeakSet()
+        self.cache = None
+        if cache_size:
+            self.cache = UserCache(cache_size, cache_ttl)
+        self._watch_conn = None
+        self._data_version = None
+        self._watch_lock = threading.Lock()
+        self.bloom_error_rate = bloom_error_rate
+        self.bloom = None
+        self._bloom_lock = threading.Lock()
+        self._bloom_rebuild_lock = threading.Lock()
+        self._bloom_inflight = Counter()
+        self._bloom_pending = None
+        self._bloom_skipped = 0
+        self.write_behind = None
+        if write_behind_rows:
+            self.write_behind = WriteBehindQueue(
+                self._insert_batch, write_behind_rows, write_behind_ms / 1000
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Write queued users, then release pooled and per-thread connections."""
+        if self.write_behind is not None:
+            self.write_behind.close()
+        if self.pool is not None:
+            self.pool.close()
+        if self.writer is not None:
+            self.writer.close()
+            for holder in list(self._thread_conns):
+                holder.finalizer()
+            self._local = threading.local()
+        with self._watch_lock:
+            if self._watch_conn is not None:
+                self._watch_conn.close()
+                self._watch_conn = None
+
+    def stats(self):
+        """Return per-method instrumentation snapshot, or None when disabled."""
+        return None if self.instrumentation is None else self.instrumentation.stats()
+
+    def cache_stats(self):
+        """Return cache counters, or None when caching is disabled."""
+        return None if self.cache is None else self.cache.stats()
+
+    def _validate_cache(self):
+        """Clear the cache if any connection committed since the last check.
+
+        PRAGMA data_version on a long-lived connection changes whenever another
+        connection - from this manager or another process - commits to the file.
+        """
+        with self._watch_lock:
+            if self._watch_conn is None:
+                self._watch_conn = self._open_connection()
+            version = self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._data_version:
+                self._data_version = version
+                self.cache.clear()
+
+    @_instrumented
+    def rebuild_bloom(self, capacity=None):
+        """Rebuild the email Bloom filter from the email index.
+
+        capacity defaults to twice the current row count, leaving room for
+        new users before the false positive rate degrades.
+        """
+        if self.bloom_error_rate is None:
+            raise RuntimeError("Bloom filter is not enabled")
+        with self._bloom_rebuild_lock:
+            self._rebuild_bloom(capacity)
+
+    def _rebuild_bloom(self, capacity=None):
+        """Scan emails into a new filter and swap it in. Caller holds rebuild lock.
+
+        Writes that are in flight when the scan starts, or begin during it,
+        may commit after the scan has passed them, so their emails are
+        collected separately and merged in before the swap.
+        """
+        with self._bloom_lock:
+            self._bloom_pending = set(self._bloom_inflight)
+        try:
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                if capacity is None:
+                    capacity = max(1024, 2 * _scalar(cursor, "SELECT COUNT(*) FROM users"))
+                bloom = BloomFilter(capacity, self.bloom_error_rate)
+                # covered by idx_users_email, so only the index is scanned
+                cursor.execute("SELECT email FROM users")
+                for (email,) in cursor:
+                    bloom.add(email)
+            with self._bloom_lock:
+                for email in self._bloom_pending:
+                    bloom.add(email)
+                self.bloom = bloom
+        finally:
+            with self._bloom_lock:
+                self._bloom_pending = None
+
+    def bloom_stats(self):
+        """Return Bloom filter size and usage, or None when disabled."""
+        bloom = self.bloom
+        if bloom is None:
+            return None
+        return {
+            "capacity": bloom.capacity,
+            "items": bloom.count,
+            "error_rate": bloom.error_rate,
+            "memory_bytes": bloom.memory_bytes,
+            "skipped_queries": self._bloom_skipped,
+        }
+
+    @contextmanager
+    def _bloom_writing(self, emails=()):
+        """Wrap a write of new emails; yields add(emails) for more of them.
+
+        Emails are added to the filter before the write commits, so a
+        concurrent user_exists() never gets a false negative, and stay
+        tracked as in flight until the write ends for _rebuild_bloom().
+        """
+        if self.bloom_error_rate is None:
+            yield lambda emails: None
+            return
+        added = Counter()
+
+        def add(emails):
+            emails = Counter(emails)
+            added.update(emails)
+            with self._bloom_lock:
+                self._bloom_inflight.update(emails)
+                if self._bloom_pending is not None:
+                    self._bloom_pending.update(emails)
+                if self.bloom is not None:
+                    for email in emails:
+                        self.bloom.add(email)
+
+        add(emails)
+        try:
+            yield add
+        finally:
+            with self._bloom_lock:
+                self._bloom_inflight -= added
+
+    @_instrumented
+    def init_schema(self, target=None):
+        """Create or upgrade the users table and indexes. Returns version."""
+        with self._connection(write=True) as conn:
+            return SchemaManager().migrate(conn, target)
+
+    def _row_factory(self, row_format=None):
+        return _row_converter(self.row_format if row_format is None else row_format)
+
+    def _open_connection(self):
+        # "file:" paths are URIs, e.g. shared in-memory test databases
+        uri = str(self.db_path).startswith("file:")
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, uri=uri)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    @contextmanager
+    def _connection(self, write=False):
+        """Yield a connection, instrumented when a measured call is running."""
+        call = None if self.instrumentation is None else self.instrumentation.current()
+        if call is None:
+            with self._raw_connection(write) as conn:
+                yield conn
+            return
+        start = time.perf_counter()
+        with self._raw_connection(write) as conn:
+            call["connect"] += time.perf_counter() - start
+            yield _InstrumentedConnection(conn, call)
+
+    @contextmanager
+    def _raw_connection(self, write=False):
+        """Yield pooled, per-thread or writer connection, or a fresh one."""
+        if self.pool is not None:
+            with self.pool.connection() as conn:
+                yield conn
+            return
+        if self.writer is not None:
+            if write:
+                with self.writer.connection() as conn:
+                    yield conn
+            else:
+                yield self._thread_connection()
+            return
+        conn = self._open_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    def _thread_connection(self):
+        holder = getattr(self._local, "holder", None)
+        if holder is None or not holder.finalizer.alive:
+            holder = _ThreadConnection(self._open_connection())
+            self._local.holder = holder
+            self._thread_conns.add(holder)
+        return holder.conn
     
+    @_instrumented
     def create_user(self, name, email):
         """Create new user. Returns user ID."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO users (name, email) VALUES (?, ?)", (name, email))
-        user_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self._bloom_writing([email]), self._connection(write=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO users (name, email) VALUES (?, ?)", (name, email))
+            user_id = cursor.lastrowid
+            conn.commit()
+        if self.cache is not None:
+            self.cache.invalidate(user_id)
         return user_id
+
+    @_instrumented
+    def get_or_create_user(self, name, email):
+        """Return (user ID, created) for email, inserting the user if missing.
+
+        A new user costs a single INSERT ... ON CONFLICT DO NOTHING RETURNING
+        statement. Only when the email already exists is its ID looked up,
+        inside the same write transaction so the row cannot vanish between
+        the two statements. Relies on the unique email index.
+        """
+        with self._bloom_writing([email]), self._connection(write=True) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute(
+                    "INSERT INTO users (name, email) VALUES (?, ?) "
+                    "ON CONFLICT (email) DO NOTHING RETURNING id",
+                    (name, email),
+                )
+                row = cursor.fetchone()
+                created = row is not None
+                if not created:
+                    cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
+                    row = cursor.fetchone()
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        user_id = row[0]
+        if created and self.cache is not None:
+            self.cache.invalidate(user_id)
+        return user_id, created
+
+    @_instrumented
+    def create_users(self, users, batch_size=1000):
+        """Insert (name, email) pairs in one transaction. Returns range of IDs.
+
+        Rows are consumed in batches of batch_size, so generators are never
+        materialized. The write lock is held from the start, which makes the
+        new IDs consecutive.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        rows = iter(users)
+        with self._bloom_writing() as bloom_add, self._connection(write=True) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                first_id = _scalar(cursor, "SELECT COALESCE(MAX(id), 0) FROM users") + 1
+                count = 0
+                while True:
+                    batch = list(itertools.islice(rows, batch_size))
+                    if not batch:
+                        break
+                    bloom_add(email for _, email in batch)
+                    cursor.executemany("INSERT INTO users (name, email) VALUES (?, ?)", batch)
+                    count += len(batch)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        if self.cache is not None:
+            self.cache.clear()
+        return range(first_id, first_id + count)
     
-    def get_user(self, user_id):
-        """Get user by ID. Returns dict or None."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name, email FROM users WHERE id = ?", (user_id,))
-        row = cursor.fetchone()
-        conn.close()
+    def submit_user(self, name, email):
+        """Queue user for a group commit. Returns Future of the user ID."""
+        if self.write_behind is None:
+            raise RuntimeError("Write-behind mode is not enabled")
+        return self.write_behind.submit((name, email))
+
+    def flush(self):
+        """Block until all users queued with submit_user() are committed."""
+        if self.write_behind is not None:
+            self.write_behind.flush()
+
+    @_instrumented
+    def _insert_batch(self, users):
+        """Insert users in one transaction. Returns ID or error per user."""
+        results = []
+        emails = [email for _, email in users]
+        with self._bloom_writing(emails), self._connection(write=True) as conn:
+            cursor = conn.cursor()
+            try:
+                for user in users:
+                    try:
+                        cursor.execute("INSERT INTO users (name, email) VALUES (?, ?)", user)
+                        results.append(cursor.lastrowid)
+                    except sqlite3.IntegrityError as exc:
+                        results.append(exc)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        if self.cache is not None:
+            for user_id in results:
+                if not isinstance(user_id, Exception):
+                    self.cache.invalidate(user_id)
+        return results
+
+    @_instrumented
+    def get_user(self, user_id, row_format=None):
+        """Get user by ID. Returns dict (or chosen row format) or None."""
+        make_row = self._row_factory(row_format)
+        found = False
+        if self.cache is not None:
+            self._validate_cache()
+            # the cache keeps raw row tuples, so hits need no defensive copy
+            found, row = self.cache.get(user_id)
+
+        if not found:
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id, name, email FROM users WHERE id = ?", (user_id,))
+                row = cursor.fetchone()
+            if self.cache is not None:
+                self.cache.put(user_id, row)
         
         if row:
-            return {"id": row[0], "name": row[1], "email": row[2]}
+            return make_row(row)
         return None
+
+    @_instrumented
+    def get_users(self, user_ids, chunk_size=MAX_QUERY_PARAMS, row_format=None):
+        """Get many users by ID. Returns dict of ID -> user dict or None.
+
+        Every requested ID is a key of the result; IDs that do not exist map
+        to None, the same as get_user() would return for them.
+        """
+        if not 1 <= chunk_size <= MAX_QUERY_PARAMS:
+            raise ValueError(f"chunk_size must be between 1 and {MAX_QUERY_PARAMS}")
+        make_row = self._row_factory(row_format)
+        result = dict.fromkeys(user_ids)
+        ids = list(result)
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start:start + chunk_size]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(
+                    f"SELECT id, name, email FROM users WHERE id IN ({placeholders})", chunk
+                )
+                for row in cursor.fetchall():
+                    result[row[0]] = make_row(row)
+        return result
     
+    @_instrumented
+    def iter_users(self, batch_size=1000, after_id=0, row_format=None):
+        """Yield user dicts ordered by ID, starting after after_id.
+
+        Pages with WHERE id > ? so each batch is an index seek and memory stays
+        bounded by batch_size. The connection is not held between batches;
+        pass the last seen ID as after_id to resume.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        make_row = self._row_factory(row_format)
+        last_id = after_id
+        while True:
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT id, name, email FROM users WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size),
+                )
+                rows = cursor.fetchall()
+            yield from map(make_row, rows)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+    
+    @_instrumented
+    def search_users(self, query, limit=20, prefix=True, row_format=None):
+        """Find users whose name matches all words of query, best match first.
+
+        Words are quoted, so FTS5 syntax in query is searched literally. With
+        prefix=True the last word also matches longer names ("jo" -> "John").
+        """
+        make_row = self._row_factory(row_format)
+        words = query.split()
+        if not words:
+            return []
+        terms = ['"' + word.replace('"', '""') + '"' for word in words]
+        if prefix:
+            terms[-1] += "*"
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT users.id, users.name, users.email FROM users_fts "
+                "JOIN users ON users.id = users_fts.rowid "
+                "WHERE users_fts MATCH ? ORDER BY users_fts.rank LIMIT ?",
+                (" ".join(terms), limit),
+            )
+            rows = cursor.fetchall()
+        return [make_row(row) for row in rows]
+    
+    @_instrumented
     def delete_user(self, user_id):
         """Delete user by ID. Returns True if deleted."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-        deleted = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
+        with self._connection(write=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
+            deleted = cursor.rowcount > 0
+            conn.commit()
+        if self.cache is not None:
+            self.cache.invalidate(user_id)
         return deleted
     
+    @_instrumented
+    def delete_users(self, user_ids, chunk_size=MAX_QUERY_PARAMS):
+        """Delete many users by ID in one transaction. Returns deleted IDs.
+
+        IDs that did not exist are simply absent from the result.
+        """
+        if not 1 <= chunk_size <= MAX_QUERY_PARAMS:
+            raise ValueError(f"chunk_size must be between 1 and {MAX_QUERY_PARAMS}")
+        ids = list(dict.fromkeys(user_ids))
+        statements = []
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            placeholders = ", ".join("?" * len(chunk))
+            statements.append((f"DELETE FROM users WHERE id IN ({placeholders}) RETURNING id", chunk))
+        return self._delete_returning(statements)
+
+    @_instrumented
+    def delete_users_where(self, email_domain):
+        """Delete all users with an email in email_domain. Returns deleted IDs."""
+        escaped = email_domain.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return self._delete_returning([(
+            "DELETE FROM users WHERE email LIKE ? ESCAPE '\\' RETURNING id",
+            ("%@" + escaped,),
+        )])
+
+    def _delete_returning(self, statements):
+        """Run DELETE ... RETURNING id statements in one transaction.
+
+        The FTS index follows through its triggers. Deleted emails stay in
+        the Bloom filter, which only costs false positives until
+        rebuild_bloom().
+        """
+        deleted = []
+        with self._connection(write=True) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN IMMEDIATE")
+                for sql, params in statements:
+                    cursor.execute(sql, params)
+                    deleted.extend(row[0] for row in cursor.fetchall())
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        if self.cache is not None:
+            self.cache.invalidate_many(deleted)
+        return sorted(deleted)
+
+    @_instrumented
+    def user_exists(self, email):
+        """Check if user with email exists."""
+        if self.bloom_error_rate is not None:
+            if self.bloom is None:
+                with self._bloom_rebuild_lock:
+                    # concurrent first callers wait for one scan
+                    if self.bloom is None:
+                        self._rebuild_bloom()
+            if email not in self.bloom:
+                self._bloom_skipped += 1
+                return False
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            found = _scalar(
+                cursor, "SELECT EXISTS (SELECT 1 FROM users WHERE email = ?)", (email,)
+            )
+        return bool(found)
+
+
+class ShardedUserManager:
+    """Spread users over several SQLite files, routed by a hash of the email.
+
+    Every shard is a UserManager with its own connections and writer, so
+    writes to different shards do not wait for each other. Global IDs encode
+    the shard: global_id = local_id * len(db_paths) + shard. The number and
+    order of db_paths must therefore never change for an existing data set.
+    """
+
+    def __init__(self, db_paths, **options):
+        """Initialize with shard paths and UserManager arguments.
+
+        Shards use per-thread connections unless pool_size is given.
+        """
+        if not db_paths:
+            raise ValueError("db_paths must not be empty")
+        if not options.get("pool_size"):
+            options.setdefault("thread_local", True)
+        self.row_format = options.pop("row_format", "dict")
+        _row_converter(self.row_format)
+        self.shards = [UserManager(path, row_format="tuple", **options) for path in db_paths]
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.shards), thread_name_prefix="ShardedUserManager"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close every shard and the fan-out thread pool."""
+        self._executor.shutdown()
+        for shard in self.shards:
+            shard.close()
+
+    def shard_for_email(self, email):
+        """Return index of the shard that owns email."""
+        digest = hashlib.blake2b(email.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") % len(self.shards)
+
+    def _split_id(self, user_id):
+        return user_id % len(self.shards), user_id // len(self.shards)
+
+    def _global_row(self, shard_index, row, make_row):
+        return make_row((row[0] * len(self.shards) + shard_index, row[1], row[2]))
+
+    def _fan_out(self, calls):
+        """Run (func, args) calls in parallel. Returns results in order."""
+        futures = [self._executor.submit(func, *args) for func, args in calls]
+        return [future.result() for future in futures]
+
+    def init_schema(self, target=None):
+        """Create or upgrade the schema of every shard. Returns versions."""
+        return self._fan_out([(shard.init_schema, (target,)) for shard in self.shards])
+
+    def create_user(self, name, email):
+        """Create new user on its email's shard. Returns global user ID."""
+        shard_index = self.shard_for_email(email)
+        local_id = self.shards[shard_index].create_user(name, email)
+        return local_id * len(self.shards) + shard_index
+
+    def get_or_create_user(self, name, email):
+        """Return (global user ID, created) for email, inserting if missing."""
+        shard_index = self.shard_for_email(email)
+        local_id, created = self.shards[shard_index].get_or_create_user(name, email)
+        return local_id * len(self.shards) + shard_index, created
+
+    def get_user(self, user_id, row_format=None):
+        """Get user by global ID. Returns dict (or chosen row format) or None."""
+        make_row = _row_converter(row_format or self.row_format)
+        shard_index, local_id = self._split_id(user_id)
+        row = self.shards[shard_index].get_user(local_id)
+        if row:
+            return self._global_row(shard_index, row, make_row)
+        return None
+
+    def get_users(self, user_ids, row_format=None):
+        """Get many users by global ID, querying shards in parallel."""
+        make_row = _row_converter(row_format or self.row_format)
+        result = dict.fromkeys(user_ids)
+        by_shard = {}
+        for user_id in result:
+            shard_index, local_id = self._split_id(user_id)
+            by_shard.setdefault(shard_index, []).append(local_id)
+        shard_indexes = list(by_shard)
+        found = self._fan_out(
+            [(self.shards[index].get_users, (by_shard[index],)) for index in shard_indexes]
+        )
+        for shard_index, rows in zip(shard_indexes, found):
+            for row in rows.values():
+                if row:
+                    user = self._global_row(shard_index, row, make_row)
+                    result[row[0] * len(self.shards) + shard_index] = user
+        return result
+
+    def delete_user(self, user_id):
+        """Delete user by global ID. Returns True if deleted."""
+        shard_index, local_id = self._split_id(user_id)
+        return self.shards[shard_index].delete_user(local_id)
+
+    def delete_users(self, user_ids):
+        """Delete many users by global ID, shards in parallel. Returns deleted IDs."""
+        by_shard = {}
+        for user_id in dict.fromkeys(user_ids):
+            shard_index, local_id = self._split_id(user_id)
+            by_shard.setdefault(shard_index, []).append(local_id)
+        shard_indexes = list(by_shard)
+        deleted = self._fan_out(
+            [(self.shards[index].delete_users, (by_shard[index],)) for index in shard_indexes]
+        )
+        n = len(self.shards)
+        return sorted(
+            local_id * n + shard_index
+            for shard_index, local_ids in zip(shard_indexes, deleted)
+            for local_id in local_ids
+        )
+
     def user_exists(self, email):
+        """Check if user with email exists. Only the owning shard is asked."""
+        return self.shards[self.shard_for_email(email)].user_exists(email)
+
+    def iter_users(self, batch_size=1000, after_id=0, row_format=None):
+        """Yield users of all shards ordered by global ID.
+
+        Each shard is paged with keyset pagination, and the next page of every
+        shard is fetched in the background while the current one is consumed.
+        """
+        make_row = _row_converter(row_format or self.row_format)
+        n = len(self.shards)
+        streams = [
+            self._iter_shard(index, batch_size, (after_id - index) // n)
+            for index in range(n)
+        ]
+        for _, shard_index, row in heapq.merge(*streams):
+            yield self._global_row(shard_index, row, make_row)
+
+    def _iter_shard(self, shard_index, batch_size, after_local_id):
+        shard = self.shards[shard_index]
+
+        def fetch_page(after):
+            return list(itertools.islice(shard.iter_users(batch_size, after), batch_size))
+
+        pending = self._executor.submit(fetch_page, after_local_id)
+        while True:
+            rows = pending.result()
+            if len(rows) == batch_size:
+                pending = self._executor.submit(fetch_page, rows[-1][0])
+            for row in rows:
+                yield row[0] * len(self.shards) + shard_index, shard_index, row
+            if len(rows) < batch_size:
+                return
+
+
+class AsyncUserManager:
+    """Asyncio facade running a UserManager on a dedicated worker thread.
+
+    Calls are queued to the worker, so the event loop never blocks on SQLite.
+    Identical concurrent reads share one database query.
+    """
+
+    def __init__(self, db_path="users.db", **options):
+        """Initialize with UserManager arguments. Uses one pooled connection."""
+        options.setdefault("pool_size", 1)
+        self.manager = UserManager(db_path, **options)
+        self._requests = queue.Queue()
+        self._inflight = {}
+        self._closed = False
+        self._closed_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="AsyncUserManager", daemon=True)
+        self._worker.start()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Finish queued calls, stop the worker and close the manager."""
+        with self._closed_lock:
+            # calls after this point are refused, never queued behind None
+            if not self._closed:
+                self._closed = True
+                self._requests.put(None)
+        if self._worker.is_alive():
+            await asyncio.get_running_loop().run_in_executor(None, self._worker.join)
+
+    async def init_schema(self, target=None):
+        return await self._call("init_schema", target)
+
+    async def create_user(self, name, email):
+        """Create new user. Returns user ID."""
+        return await self._call("create_user", name, email)
+
+    async def get_user(self, user_id):
+        """Get user by ID. Returns dict or None."""
+        return await self._read("get_user", user_id)
+
+    async def delete_user(self, user_id):
+        """Delete user by ID. Returns True if deleted."""
+        return await self._call("delete_user", user_id)
+
+    async def user_exists(self, email):
         """Check if user with email exists."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM users WHERE email = ?", (email,))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count > 0
+        return await self._read("user_exists", email)
+
+    def _run(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            loop, future, method, args = request
+            try:
+                result, exc = getattr(self.manager, method)(*args), None
+            except BaseException as error:
+                result, exc = None, error
+            try:
+                loop.call_soon_threadsafe(_resolve_future, future, result, exc)
+            except RuntimeError:
+                pass  # caller's loop has closed; nobody is waiting any more
+        self.manager.close()
+
+    async def _call(self, method, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._closed_lock:
+            if self._closed:
+                raise RuntimeError("AsyncUserManager is closed")
+            self._requests.put((loop, future, method, args))
+        return await future
+
+    async def _read(self, method, *args):
+        key = (asyncio.get_running_loop(), method, args)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._shared_call(key, method, *args))
+            self._inflight[key] = task
+        result = await asyncio.shield(task)
+        return copy.copy(result)
+
+    async def _shared_call(self, key, method, *args):
+        try:
+            return await self._call(method, *args)
+        finally:
+            # dropped as soon as the result is in, so a read issued after
+            # that (e.g. after an awaited write) starts a fresh query
+            self._inflight.pop(key, None)
+
+
+def _resolve_future(future, result, exc):
+    if future.cancelled():
+        return
+    if exc is not None:
+        future.set_exception(exc)
+    else:
+        future.set_result(result)
 
 
 if __name__ == "__main__":
     manager = UserManager("example.db")
     
-    # Create database table first
-    conn = sqlite3.connect("example.db")
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            email TEXT NOT NULL
-        )
-    """)
-    conn.close()
+    # Create database table and indexes first
+    version = manager.init_schema()
+    print(f"Schema version: {version}")
     
     # Create new user
     user_id = manager.create_user("John Doe", "john@example.com")
@@ -81,5 +1596,67 @@ if __name__ == "__main__":
     deleted = manager.delete_user(user_id)
     print(f"User deleted: {deleted}")
     
+    # Bulk insert in a single transaction
+    ids = manager.create_users((f"User {i}", f"user{i}@example.com") for i in range(1000))
+    print(f"Bulk created IDs: {ids}")
+    
+    # Full-text name search
+    print(f"Search 'user 99': {len(manager.search_users('user 99', limit=5))} results")
+    
+    # Atomic get-or-create
+    user_id, created = manager.get_or_create_user("User 1", "user1@example.com")
+    print(f"get_or_create: id={user_id}, created={created}")
+    
+    # Batched lookup, missing IDs map to None
+    users = manager.get_users([1, 2, 5000])
+    print(f"Missing IDs: {[uid for uid, user in users.items() if user is None]}")
+    
+    # Bloom filter answers most negative lookups without a query
+    with UserManager("example.db", bloom_error_rate=0.01) as bloomed:
+        bloomed.user_exists("nobody@example.com")
+        print(f"Bloom stats: {bloomed.bloom_stats()}")
+    
+    # Write-behind: many inserts share one commit
+    with UserManager("example.db", write_behind_rows=50) as batched:
+        futures = [batched.submit_user(f"Late {i}", f"late{i}@example.com") for i in range(10)]
+        batched.flush()
+        print(f"Group-committed IDs: {[future.result() for future in futures]}")
+    
+    # Stream users page by page
+    emails = [user["email"] for user in manager.iter_users(batch_size=100, after_id=995)]
+    print(f"Users after ID 995: {emails}")
+    
+    # Sharded across several files
+    shard_paths = ["example_shard0.db", "example_shard1.db"]
+    with ShardedUserManager(shard_paths) as sharded:
+        sharded.init_schema()
+        ids = [sharded.create_user("Shard User", f"shard{i}@example.com") for i in range(4)]
+        print(f"Sharded IDs: {ids}, first: {sharded.get_user(ids[0])}")
+    for path in shard_paths:
+        os.remove(path)
+    
+    # Bulk purge by domain
+    purged = manager.delete_users_where(email_domain="example.com")
+    print(f"Purged {len(purged)} users")
+    
+    # Pooled mode reuses connections between calls
+    with UserManager("example.db", pool_size=2) as pooled:
+        user_id = pooled.create_user("Jane Doe", "jane@example.com")
+        print(f"Pooled get: {pooled.get_user(user_id)}")
+    
+    # Cached reads
+    with UserManager("example.db", cache_size=100) as cached:
+        for _ in range(3):
+            cached.get_user(user_id)
+        print(f"Cache stats: {cached.cache_stats()}")
+    
+    # Async facade
+    async def async_demo():
+        async with AsyncUserManager("example.db") as async_manager:
+            users = await asyncio.gather(*(async_manager.get_user(user_id) for _ in range(3)))
+            print(f"Async get: {users[0]}")
+    
+    asyncio.run(async_demo())
+    
     # Cleanup
-    os.remove("example.db")
\ No newline at end of file
+    os.remove("example.db")
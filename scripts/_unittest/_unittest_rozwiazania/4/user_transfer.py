@@ -0,0 +1,136 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from user_manager import PROFILES, UserManager
+
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+FIELDS = ["id", "name", "email"]
+
+
+def detect_format(path, file_format=None):
+    """Return "csv" or "jsonl" from explicit format or file extension."""
+    if file_format is None:
+        file_format = FORMATS.get(os.path.splitext(path)[1].lower())
+    if file_format not in ("csv", "jsonl"):
+        raise ValueError(f"Cannot determine format of {path!r}, use csv or jsonl")
+    return file_format
+
+
+class Progress:
+    """Count rows and report them to a callback every `every` rows."""
+
+    def __init__(self, callback=None, every=10000):
+        self.callback = callback
+        self.every = every
+        self.rows = 0
+        self.start = time.perf_counter()
+
+    def tick(self):
+        self.rows += 1
+        if self.callback is not None and self.rows % self.every == 0:
+            self.callback(self.rows, time.perf_counter() - self.start)
+
+    def summary(self):
+        """Return rows, elapsed seconds and throughput."""
+        seconds = time.perf_counter() - self.start
+        return {
+            "rows": self.rows,
+            "seconds": seconds,
+            "rows_per_second": self.rows / seconds if seconds else 0.0,
+        }
+
+
+def _read_rows(f, file_format):
+    if file_format == "csv":
+        for record in csv.DictReader(f):
+            yield record["name"], record["email"]
+    else:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield record["name"], record["email"]
+
+
+def import_users(manager, path, file_format=None, batch_size=1000, progress=None,
+                 progress_every=10000):
+    """Stream users from a CSV or JSON Lines file into the database.
+
+    Rows are inserted with create_users(), so the file is read lazily and
+    the whole import is one transaction. The id column, if present, is
+    ignored and new IDs are assigned. Returns a summary dict.
+    """
+    file_format = detect_format(path, file_format)
+    counter = Progress(progress, progress_every)
+
+    def counted(rows):
+        for row in rows:
+            counter.tick()
+            yield row
+
+    with open(path, newline="", encoding="utf-8") as f:
+        ids = manager.create_users(counted(_read_rows(f, file_format)), batch_size)
+    summary = counter.summary()
+    summary["ids"] = ids
+    return summary
+
+
+def export_users(manager, path, file_format=None, batch_size=1000, progress=None,
+                 progress_every=10000):
+    """Stream all users into a CSV or JSON Lines file. Returns a summary dict.
+
+    Users are read with iter_users() keyset pagination, so memory does not
+    grow with the table size.
+    """
+    file_format = detect_format(path, file_format)
+    counter = Progress(progress, progress_every)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = None
+        if file_format == "csv":
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+        for row in manager.iter_users(batch_size=batch_size, row_format="tuple"):
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                f.write(json.dumps(dict(zip(FIELDS, row))) + "\n")
+            counter.tick()
+    return counter.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or export the users table.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("db_path", help="SQLite database file")
+    parser.add_argument("path", help="CSV or JSON Lines file")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="default: from extension")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--profile", choices=sorted(PROFILES),
+        help="import pragmas; bulk-load persists WAL mode and runs with synchronous=OFF "
+             "(default: leave the database settings alone)",
+    )
+    args = parser.parse_args(argv)
+
+    def report(rows, seconds):
+        print(f"{rows:,} rows, {rows / seconds:,.0f} rows/s", file=sys.stderr)
+
+    if args.command == "import":
+        manager = UserManager(args.db_path, profile=args.profile)
+        manager.init_schema()
+        summary = import_users(manager, args.path, args.format, args.batch_size, report)
+    else:
+        if args.profile is not None:
+            parser.error("--profile only applies to import")
+        manager = UserManager(args.db_path)
+        summary = export_users(manager, args.path, args.format, args.batch_size, report)
+    print(f"{args.command}ed {summary['rows']:,} users in {summary['seconds']:.2f}s "
+          f"({summary['rows_per_second']:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()